@@ -3,6 +3,10 @@ from PIL import Image, ImageDraw, ImageFont
 import pandas as pd
 from datetime import datetime
 from collections import defaultdict
+from functools import partial
+from assets import load_font, load_template, load_logo
+from logo_index import get_logo_index
+from budget import checkpoint
 print("STARTING STREAMLIT FIXTURES SCRIPT")
 
 # --- Streamlit/GitHub Environment Setup ---
@@ -50,11 +54,7 @@ FONT_SIZE_DATE = 40
 FONT_SIZE_DATE_MIN = 30
 VISUAL_Y_OFFSET_CORRECTION = -5
 
-# Special Mappings
-SPECIAL_LOGO_MAPPING = {
-    "afc aldermaston a": "AFC Aldermaston.png",
-    "afc aldermaston b": "AFC Aldermaston.png",
-}
+# Special Mappings (logo aliases live in logo_index.SPECIAL_LOGO_MAPPING)
 TEAMS_FOR_SMALLER_FONT = ["AFC Aldermaston A", "AFC Aldermaston B"]
 
 # --- Pre-calculate spacing ---
@@ -62,8 +62,8 @@ HEADING_SPACE = 100
 CUP_NAME_SPACE = 70
 if os.path.exists(FONT_PATH):
     try:
-        HEADING_FONT_TEMP = ImageFont.truetype(FONT_PATH, FONT_SIZE_HEADING)
-        CUP_NAME_FONT_TEMP = ImageFont.truetype(FONT_PATH, FONT_SIZE_CUP_NAME)
+        HEADING_FONT_TEMP = load_font(FONT_PATH, FONT_SIZE_HEADING)
+        CUP_NAME_FONT_TEMP = load_font(FONT_PATH, FONT_SIZE_CUP_NAME)
         heading_bbox = HEADING_FONT_TEMP.getbbox("Division 1")
         cup_name_bbox = CUP_NAME_FONT_TEMP.getbbox("Example Cup Name")
         HEADING_SPACE = 20 + (heading_bbox[3] - heading_bbox[1]) + 20
@@ -80,41 +80,18 @@ print("Configuration constants loaded.")
 
 # --- Helper Functions ---
 def get_logo(team_name: str, logos_folder: str) -> Image.Image:
-    team_name_lower = team_name.strip().lower()
-    team_name_clean = team_name.strip()
-
-    for key, filename in SPECIAL_LOGO_MAPPING.items():
-        if key in team_name_lower:
-            for subfolder in ['Current Teams', 'Old Teams']:
-                path = os.path.join(logos_folder, subfolder, filename)
-                if os.path.exists(path):
-                    try:
-                        return Image.open(path).convert("RGBA").resize((LOGO_WIDTH, LOGO_HEIGHT), Image.LANCZOS)
-                    except Exception as e:
-                        print(f"Error loading mapped logo: {e}")
-                        break
-
-    search_variants = [team_name_lower.replace(" ", "")]
-    if "utd" in team_name_lower: search_variants.append(team_name_lower.replace("utd", "united").replace(" ", ""))
-    if "united" in team_name_lower: search_variants.append(team_name_lower.replace("united", "utd").replace(" ", ""))
-    if "&" in team_name_lower: search_variants.append(team_name_lower.replace("&", "and").replace(" ", ""))
-    if "and" in team_name_lower: search_variants.append(team_name_lower.replace("and", "&").replace(" ", ""))
-    search_variants = list(set(search_variants))
-
-    for subfolder in ['Current Teams', 'Old Teams']:
-        folder = os.path.join(logos_folder, subfolder)
-        if not os.path.isdir(folder): continue
-        for f in os.listdir(folder):
-            f_lower = f.lower().replace(" ", "")
-            if any(v in f_lower for v in search_variants) and f_lower.endswith(('.png', '.jpg', '.jpeg')):
-                try:
-                    return Image.open(os.path.join(folder, f)).convert("RGBA").resize((LOGO_WIDTH, LOGO_HEIGHT), Image.LANCZOS)
-                except Exception as e:
-                    print(f"Error loading logo: {e}")
-
-    generic_path = os.path.join(logos_folder, 'genericlogo.png')
+    # Resolved through the shared logo index (aliases, name variants, one folder scan)
+    index = get_logo_index(logos_folder)
+    logo_path = index.resolve(team_name)
+    if logo_path:
+        try:
+            return load_logo(logo_path, (LOGO_WIDTH, LOGO_HEIGHT))
+        except Exception as e:
+            print(f"Error loading logo: {e}")
+
+    generic_path = index.generic_path
     try:
-        return Image.open(generic_path).convert("RGBA").resize((LOGO_WIDTH, LOGO_HEIGHT), Image.LANCZOS)
+        return load_logo(generic_path, (LOGO_WIDTH, LOGO_HEIGHT))
     except Exception as e:
         print(f"Generic logo failed: {e}. Using gray placeholder.")
         return Image.new("RGBA", (LOGO_WIDTH, LOGO_HEIGHT), (200, 200, 200, 255))
@@ -186,9 +163,9 @@ def calculate_division_height(division_name: str, matches: list, is_first_divisi
 
 
 # --- Graphic Generation ---
-def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folder: str, save_folder: str, part_number: int, template_path: str, current_date: datetime):
+def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folder: str, save_folder: str, part_number: int, template_path: str, current_date: datetime, font_path: str = FONT_PATH):
     try:
-        template = Image.open(template_path).convert("RGBA")
+        template = load_template(template_path)
         if template.size != (IMAGE_WIDTH, IMAGE_HEIGHT):
             raise ValueError(f"Template must be {IMAGE_WIDTH}x{IMAGE_HEIGHT}")
     except Exception as e:
@@ -199,11 +176,11 @@ def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folde
     d = ImageDraw.Draw(img)
 
     try:
-        font = ImageFont.truetype(FONT_PATH, FONT_SIZE_NORMAL)
-        score_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_SCORE)
-        heading_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_HEADING)
-        cup_name_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_CUP_NAME)
-        small_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_SMALL_TEAM_NAME)
+        font = load_font(font_path, FONT_SIZE_NORMAL)
+        score_font = load_font(font_path, FONT_SIZE_SCORE)
+        heading_font = load_font(font_path, FONT_SIZE_HEADING)
+        cup_name_font = load_font(font_path, FONT_SIZE_CUP_NAME)
+        small_font = load_font(font_path, FONT_SIZE_SMALL_TEAM_NAME)
     except Exception as e:
         print(f"Font load failed: {e}. Using default.")
         font = score_font = heading_font = cup_name_font = small_font = ImageFont.load_default()
@@ -217,7 +194,7 @@ def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folde
     year = current_date.strftime("%Y")
     font_size = FONT_SIZE_DATE
     while font_size >= FONT_SIZE_DATE_MIN:
-        df = ImageFont.truetype(FONT_PATH, int(font_size * HIGH_RES_SCALE))
+        df = load_font(font_path, int(font_size * HIGH_RES_SCALE))
         db = cd.textbbox((0,0), day, font=df)
         mb = cd.textbbox((0,0), month, font=df)
         yb = cd.textbbox((0,0), year, font=df)
@@ -251,7 +228,8 @@ def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folde
 
         last_cup = None
         for match in matches:
-            t1, s1, s2, t2, cup_name = match
+            checkpoint()
+            t1, s1, s2, t2, cup_name = match[:5]
 
             if div_name == "Cup" and cup_name and cup_name != last_cup:
                 bbox = d.textbbox((0,0), cup_name, font=cup_name_font)
@@ -311,24 +289,30 @@ def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folde
 
 
 # --- MAIN LOGIC WITH NEW LEAGUE GROUPING ---
-def generate_fixtures_graphics(file_path: str, logos_folder: str, save_folder: str, template_path: str):
-    # Date
-    try:
-        df = pd.read_excel(file_path, sheet_name='Date')
-        date_str = str(df['Date'].iloc[0]).strip()
-        current_date = pd.to_datetime(date_str, errors='coerce')
-        if pd.isna(current_date):
-            raise ValueError()
-        print(f"Date parsed: {current_date.strftime('%d %B %Y')}")
-    except Exception as e:
-        print(f"Date error: {e}. Using now.")
-        current_date = datetime.now()
+def generate_fixtures_graphics(file_path: str, logos_folder: str, save_folder: str, template_path: str, font_path: str = FONT_PATH, progress_callback=None, workbook=None):
+    if workbook is not None:
+        print("Using pre-parsed workbook data.")
+        current_date = workbook.date if workbook.date is not None else datetime.now()
+        load_matches = workbook.matches
+    else:
+        load_matches = partial(parse_matches_from_file, file_path)
+        # Date
+        try:
+            df = pd.read_excel(file_path, sheet_name='Date')
+            date_str = str(df['Date'].iloc[0]).strip()
+            current_date = pd.to_datetime(date_str, errors='coerce')
+            if pd.isna(current_date):
+                raise ValueError()
+            print(f"Date parsed: {current_date.strftime('%d %B %Y')}")
+        except Exception as e:
+            print(f"Date error: {e}. Using now.")
+            current_date = datetime.now()
 
     # Load data
-    cup_matches = parse_matches_from_file(file_path, "Cup")
+    cup_matches = load_matches("Cup")
     league_divisions_map = {}
     for div in LEAGUE_DIVISION_ORDER:
-        matches = parse_matches_from_file(file_path, div)
+        matches = load_matches(div)
         if matches:
             league_divisions_map[div] = {'division': div, 'matches': matches}
 
@@ -344,12 +328,13 @@ def generate_fixtures_graphics(file_path: str, logos_folder: str, save_folder: s
 
     part_number = 1
     trophy_included = False
-    saved_paths = []
+    pages = []  # Sections for each part, planned before anything is drawn
 
     # === CUP GRAPHICS ===
     remaining_cup = cup_divisions.copy()
     print("\n=== CUP GRAPHICS ===")
     while remaining_cup:
+        checkpoint()
         sections = []
         height = 0
         next_cup = []
@@ -402,8 +387,7 @@ def generate_fixtures_graphics(file_path: str, logos_folder: str, save_folder: s
 
         if sections:
             print(f"Final Cup Part {part_number}: {[s[0] for s in sections]}, {height}px")
-            path = create_match_graphic_with_heading(sections, logos_folder, save_folder, part_number, template_path, current_date)
-            saved_paths.append(path)
+            pages.append(sections)
             part_number += 1
 
         remaining_cup = next_cup
@@ -446,8 +430,7 @@ def generate_fixtures_graphics(file_path: str, logos_folder: str, save_folder: s
 
     if g1_sections:
         print(f"\n--- League Graphic {part_number}: {[s[0] for s in g1_sections]}, {g1_height}px ---")
-        path = create_match_graphic_with_heading(g1_sections, logos_folder, save_folder, part_number, template_path, current_date)
-        saved_paths.append(path)
+        pages.append(g1_sections)
         part_number += 1
 
     # PART 2: Remaining divisions
@@ -461,6 +444,7 @@ def generate_fixtures_graphics(file_path: str, logos_folder: str, save_folder: s
 
     # PART 3: Greedy for rest
     while remaining_league:
+        checkpoint()
         sections = []
         height = 0
         next_league = []
@@ -479,15 +463,26 @@ def generate_fixtures_graphics(file_path: str, logos_folder: str, save_folder: s
 
         if sections:
             print(f"Final League Part {part_number}: {[s[0] for s in sections]}, {height}px")
-            path = create_match_graphic_with_heading(sections, logos_folder, save_folder, part_number, template_path, current_date)
-            saved_paths.append(path)
+            pages.append(sections)
             part_number += 1
 
         remaining_league = next_league
         if not next_league and sections:
             break
 
-    print(f"\nCompleted: {part_number-1} graphic(s) generated")
+    # === RENDER PLANNED PARTS ===
+    # Planning first means the total is known, so progress can be reported as
+    # "Part N of M" and each part can be shown as soon as it is saved.
+    saved_paths = []
+    total_parts = len(pages)
+    for part_number, sections in enumerate(pages, start=1):
+        checkpoint()
+        path = create_match_graphic_with_heading(sections, logos_folder, save_folder, part_number, template_path, current_date, font_path)
+        saved_paths.append(path)
+        if progress_callback:
+            progress_callback(part_number, total_parts, path)
+
+    print(f"\nCompleted: {len(saved_paths)} graphic(s) generated")
     return saved_paths
 
 
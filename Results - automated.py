@@ -3,6 +3,10 @@ from PIL import Image, ImageDraw, ImageFont
 import pandas as pd
 from datetime import datetime
 from collections import defaultdict
+from functools import partial
+from assets import load_font, load_template, load_logo
+from logo_index import get_logo_index
+from budget import checkpoint
 
 print("STARTING RESULTS SCRIPT")
 
@@ -49,13 +53,9 @@ FONT_SIZE_DATE_MIN = 30
 FONT_SIZE_PENALTY_SCORE = 32
 FONT_SIZE_PENALTIES_LABEL = 28
 VISUAL_Y_OFFSET_CORRECTION = -5
+ROW_REGION_MARGIN = 3  # Must stay below FIXTURE_SPACING / 2 so a row patch never touches its neighbours
 
-# Special Mappings
-SPECIAL_LOGO_MAPPING = {
-    "afc aldermaston a": "AFC Aldermaston.png",
-    "afc aldermaston b": "AFC Aldermaston.png",
-    "eversley & california sunday": "Eversley & California.png",
-}
+# Special Mappings (logo aliases live in logo_index.SPECIAL_LOGO_MAPPING)
 TEAMS_FOR_SMALLER_FONT = ["AFC Aldermaston A", "AFC Aldermaston B"]
 
 # --- Pre-calculate spacing ---
@@ -63,8 +63,8 @@ HEADING_SPACE = 100
 CUP_NAME_SPACE = 70
 if os.path.exists(FONT_PATH):
     try:
-        HEADING_FONT_TEMP = ImageFont.truetype(FONT_PATH, FONT_SIZE_HEADING)
-        CUP_NAME_FONT_TEMP = ImageFont.truetype(FONT_PATH, FONT_SIZE_CUP_NAME)
+        HEADING_FONT_TEMP = load_font(FONT_PATH, FONT_SIZE_HEADING)
+        CUP_NAME_FONT_TEMP = load_font(FONT_PATH, FONT_SIZE_CUP_NAME)
         heading_bbox = HEADING_FONT_TEMP.getbbox("Cup")
         cup_name_bbox = CUP_NAME_FONT_TEMP.getbbox("Example Cup Name")
         HEADING_SPACE = 20 + (heading_bbox[3] - heading_bbox[1]) + 20
@@ -81,44 +81,19 @@ print("Configuration constants loaded.")
 
 # --- Helper Functions ---
 def get_logo(team_name: str, logos_folder: str) -> Image.Image:
-    team_name_lower = team_name.strip().lower()
-    team_name_clean = team_name.strip()
-
-    # Special mapping
-    for key, filename in SPECIAL_LOGO_MAPPING.items():
-        if key in team_name_lower:
-            for subfolder in ['Current Teams', 'Old Teams']:
-                path = os.path.join(logos_folder, subfolder, filename)
-                if os.path.exists(path):
-                    try:
-                        return Image.open(path).convert("RGBA").resize((LOGO_WIDTH, LOGO_HEIGHT), Image.Resampling.LANCZOS)
-                    except Exception as e:
-                        print(f"Error loading mapped logo: {e}")
-                        break
-
-    # Search by name variants
-    search_variants = [team_name_lower.replace(" ", "")]
-    if "utd" in team_name_lower: search_variants.append(team_name_lower.replace("utd", "united").replace(" ", ""))
-    if "united" in team_name_lower: search_variants.append(team_name_lower.replace("united", "utd").replace(" ", ""))
-    if "&" in team_name_lower: search_variants.append(team_name_lower.replace("&", "and").replace(" ", ""))
-    if "and" in team_name_lower: search_variants.append(team_name_lower.replace("and", "&").replace(" ", ""))
-    search_variants = list(set(search_variants))
-
-    for subfolder in ['Current Teams', 'Old Teams']:
-        folder = os.path.join(logos_folder, subfolder)
-        if not os.path.isdir(folder): continue
-        for f in os.listdir(folder):
-            f_lower = f.lower().replace(" ", "")
-            if any(v in f_lower for v in search_variants) and f_lower.endswith(('.png', '.jpg', '.jpeg')):
-                try:
-                    return Image.open(os.path.join(folder, f)).convert("RGBA").resize((LOGO_WIDTH, LOGO_HEIGHT), Image.Resampling.LANCZOS)
-                except Exception as e:
-                    print(f"Error loading logo: {e}")
+    # Resolved through the shared logo index (aliases, name variants, one folder scan)
+    index = get_logo_index(logos_folder)
+    logo_path = index.resolve(team_name)
+    if logo_path:
+        try:
+            return load_logo(logo_path, (LOGO_WIDTH, LOGO_HEIGHT))
+        except Exception as e:
+            print(f"Error loading logo: {e}")
 
     # Generic fallback
-    generic_path = os.path.join(logos_folder, 'genericlogo.png')
+    generic_path = index.generic_path
     try:
-        return Image.open(generic_path).convert("RGBA").resize((LOGO_WIDTH, LOGO_HEIGHT), Image.Resampling.LANCZOS)
+        return load_logo(generic_path, (LOGO_WIDTH, LOGO_HEIGHT))
     except Exception as e:
         print(f"Generic logo failed: {e}. Using gray placeholder.")
         return Image.new("RGBA", (LOGO_WIDTH, LOGO_HEIGHT), (200, 200, 200, 255))
@@ -200,30 +175,149 @@ def calculate_division_height(division_name: str, matches: list, is_first_divisi
 
 
 # --- Graphic Generation ---
-def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folder: str, save_folder: str, part_number: int, template_path: str, current_date: datetime):
+def load_result_fonts(font_path: str = FONT_PATH) -> tuple:
+    """
+    Returns (font, score_font, heading_font, cup_name_font, small_font, penalty_font, label_font).
+    """
     try:
-        template = Image.open(template_path).convert("RGBA")
+        return (
+            load_font(font_path, FONT_SIZE_NORMAL),
+            load_font(font_path, FONT_SIZE_SCORE),
+            load_font(font_path, FONT_SIZE_HEADING),
+            load_font(font_path, FONT_SIZE_CUP_NAME),
+            load_font(font_path, FONT_SIZE_SMALL_TEAM_NAME),
+            load_font(font_path, FONT_SIZE_PENALTY_SCORE),
+            load_font(font_path, FONT_SIZE_PENALTIES_LABEL),
+        )
+    except Exception as e:
+        print(f"Font load failed: {e}. Using default.")
+        return (ImageFont.load_default(),) * 7
+
+
+def load_result_template(template_path: str) -> Image.Image:
+    """
+    Returns the shared, cached template (callers must copy it before drawing).
+    """
+    try:
+        template = load_template(template_path)
         if template.size != (IMAGE_WIDTH, IMAGE_HEIGHT):
             raise ValueError(f"Template must be {IMAGE_WIDTH}x{IMAGE_HEIGHT}")
     except Exception as e:
         print(f"Template error: {e}. Using blank.")
         template = Image.new("RGBA", (IMAGE_WIDTH, IMAGE_HEIGHT), (0, 0, 0, 0))
-
-    img = template.copy()
+    return template
+
+
+def layout_team_name(d: ImageDraw.ImageDraw, team: str, x: int, y_offset: float, fonts: tuple) -> list[tuple]:
+    """
+    Returns ((x, y), line, font) for each wrapped line of a team name centred in the team box at x.
+    """
+    font, small_font = fonts[0], fonts[4]
+    f = small_font if team in TEAMS_FOR_SMALLER_FONT else font
+    lines = wrap_text(team, f, TEAM_BOX_WIDTH - 20, d)
+    h = get_wrapped_text_block_height(lines, f, LINE_SPACING, d)
+    cur_y = y_offset + (BOX_HEIGHT - h) // 2 + VISUAL_Y_OFFSET_CORRECTION
+    placed = []
+    for line in lines:
+        bbox = d.textbbox((0, 0), line, font=f)
+        placed.append(((x + (TEAM_BOX_WIDTH - (bbox[2] - bbox[0])) // 2, cur_y), line, f))
+        cur_y += (bbox[3] - bbox[1]) + LINE_SPACING
+    return placed
+
+
+def draw_result_row(img: Image.Image, d: ImageDraw.ImageDraw, match: tuple, div_name: str, y_offset: float, logos_folder: str, fonts: tuple):
+    """
+    Draws one match row (logos, team boxes and score box) with its top edge at y_offset.
+    """
+    font, score_font, heading_font, cup_name_font, small_font, penalty_font, label_font = fonts
+    t1, s1, s2, t2, cup_name, pen = match
+
+    logo1 = get_logo(t1, logos_folder)
+    logo2 = get_logo(t2, logos_folder)
+    img.paste(logo1, (LEFT_PADDING + 1, int(y_offset) + 1), logo1)
+
+    # Team 1
+    x1 = LEFT_PADDING + LOGO_WIDTH + 3
+    d.rectangle([x1, y_offset, x1 + TEAM_BOX_WIDTH, y_offset + BOX_HEIGHT - 1], fill=(0, 0, 0, 180))
+    for xy, line, f1 in layout_team_name(d, t1, x1, y_offset, fonts):
+        d.text(xy, line, fill=(255, 255, 255), font=f1)
+
+    # Score
+    sx = x1 + TEAM_BOX_WIDTH + 5
+    d.rectangle([sx, y_offset, sx + SCORE_BOX_WIDTH, y_offset + BOX_HEIGHT - 1], fill=(0, 0, 0, 180))
+    score_text = f"{s1} - {s2}"
+    sbox = d.textbbox((0, 0), score_text, font=score_font)
+    if div_name.lower() == "cup" and pen:
+        reg_y = y_offset + 8
+        d.text((sx + (SCORE_BOX_WIDTH - (sbox[2] - sbox[0])) // 2, reg_y), score_text, fill=(255, 255, 255), font=score_font)
+        label = "PENALTIES"
+        lb = d.textbbox((0, 0), label, font=label_font)
+        ly = reg_y + (sbox[3] - sbox[1]) + 12
+        d.text((sx + (SCORE_BOX_WIDTH - (lb[2] - lb[0])) // 2, ly), label, fill=(255, 255, 0), font=label_font)
+        pb = d.textbbox((0, 0), pen, font=penalty_font)
+        py = ly + (lb[3] - lb[1]) + 8
+        d.text((sx + (SCORE_BOX_WIDTH - (pb[2] - pb[0])) // 2, py), pen, fill=(255, 255, 255), font=penalty_font)
+    else:
+        d.text((sx + (SCORE_BOX_WIDTH - (sbox[2] - sbox[0])) // 2, y_offset + (BOX_HEIGHT - (sbox[3] - sbox[1])) // 2), score_text, fill=(255, 255, 255), font=score_font)
+
+    # Team 2
+    x2 = sx + SCORE_BOX_WIDTH + 5
+    d.rectangle([x2, y_offset, x2 + TEAM_BOX_WIDTH, y_offset + BOX_HEIGHT - 1], fill=(0, 0, 0, 180))
+    for xy, line, f2 in layout_team_name(d, t2, x2, y_offset, fonts):
+        d.text(xy, line, fill=(255, 255, 255), font=f2)
+    img.paste(logo2, (x2 + TEAM_BOX_WIDTH + 2, int(y_offset) + 1), logo2)
+
+
+
+def result_row_region(y_offset: float) -> tuple:
+    """
+    The band of the image a match row draws into, with a small margin that
+    stays inside the spacing between rows.
+    """
+    return (0, max(0, int(y_offset) - ROW_REGION_MARGIN), IMAGE_WIDTH, min(IMAGE_HEIGHT, int(y_offset) + BOX_HEIGHT + ROW_REGION_MARGIN))
+
+
+def result_row_fits(match: tuple, div_name: str, y_offset: float, font_path: str = FONT_PATH) -> bool:
+    """
+    True if the row's team names stay inside result_row_region(y_offset). A name
+    that wraps to three or more lines spills over the neighbouring rows, so such
+    a row cannot be patched on its own.
+    """
+    d = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    fonts = load_result_fonts(font_path)
+    top, bottom = result_row_region(y_offset)[1::2]
+    x1 = LEFT_PADDING + LOGO_WIDTH + 3
+    x2 = x1 + TEAM_BOX_WIDTH + 5 + SCORE_BOX_WIDTH + 5
+    for team, x in ((match[0], x1), (match[3], x2)):
+        for xy, line, f in layout_team_name(d, team, x, y_offset, fonts):
+            bbox = d.textbbox(xy, line, font=f)
+            if bbox[1] < top or bbox[3] > bottom:
+                return False
+    return True
+
+
+def patch_result_row(img: Image.Image, match: tuple, div_name: str, y_offset: float, logos_folder: str, template_path: str, font_path: str = FONT_PATH):
+    """
+    Redraws a single match row in place: the row's band is restored from the
+    template and drawn again, leaving the date circle, headings and other rows untouched.
+    Only valid when result_row_fits() holds for both the old and the new match.
+    """
+    region = result_row_region(y_offset)
+    img.paste(load_result_template(template_path).crop(region), region[:2])
+    draw_result_row(img, ImageDraw.Draw(img), match, div_name, y_offset, logos_folder, load_result_fonts(font_path))
+
+
+def render_results_part(sections_to_draw: list[tuple], logos_folder: str, template_path: str, current_date: datetime, font_path: str = FONT_PATH) -> tuple:
+    """
+    Draws one part without saving it.
+    Returns (image, rows) where rows lists (div_name, match, y_offset) for every match drawn.
+    """
+    img = load_result_template(template_path).copy()
     d = ImageDraw.Draw(img)
 
     # Load fonts
-    try:
-        font = ImageFont.truetype(FONT_PATH, FONT_SIZE_NORMAL)
-        score_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_SCORE)
-        heading_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_HEADING)
-        cup_name_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_CUP_NAME)
-        small_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_SMALL_TEAM_NAME)
-        penalty_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_PENALTY_SCORE)
-        label_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_PENALTIES_LABEL)
-    except Exception as e:
-        print(f"Font load failed: {e}. Using default.")
-        font = score_font = heading_font = cup_name_font = small_font = penalty_font = label_font = ImageFont.load_default()
+    fonts = load_result_fonts(font_path)
+    font, score_font, heading_font, cup_name_font, small_font, penalty_font, label_font = fonts
 
     # Date circle
     high_res = DATE_CIRCLE_SIZE * HIGH_RES_SCALE
@@ -234,7 +328,7 @@ def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folde
     year = current_date.strftime("%Y")
     font_size = FONT_SIZE_DATE
     while font_size >= FONT_SIZE_DATE_MIN:
-        df = ImageFont.truetype(FONT_PATH, int(font_size * HIGH_RES_SCALE))
+        df = load_font(font_path, int(font_size * HIGH_RES_SCALE))
         db = cd.textbbox((0, 0), day, font=df)
         mb = cd.textbbox((0, 0), month, font=df)
         yb = cd.textbbox((0, 0), year, font=df)
@@ -256,6 +350,7 @@ def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folde
     circle = circle.resize((DATE_CIRCLE_SIZE, DATE_CIRCLE_SIZE), Image.Resampling.LANCZOS)
     img.paste(circle, (DATE_CIRCLE_X, DATE_CIRCLE_Y), circle)
 
+    rows = []
     y_offset = CONTENT_START_Y
     is_first = True
     for div_name, matches in sections_to_draw:
@@ -270,6 +365,7 @@ def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folde
 
         last_cup = None
         for match in matches:
+            checkpoint()
             t1, s1, s2, t2, cup_name, pen = match
 
             if div_name.lower() == "cup" and cup_name and cup_name != last_cup:
@@ -280,60 +376,18 @@ def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folde
             else:
                 y_offset += FIXTURE_SPACING
 
-            logo1 = get_logo(t1, logos_folder)
-            logo2 = get_logo(t2, logos_folder)
-            img.paste(logo1, (LEFT_PADDING + 1, int(y_offset) + 1), logo1)
-
-            # Team 1
-            x1 = LEFT_PADDING + LOGO_WIDTH + 3
-            d.rectangle([x1, y_offset, x1 + TEAM_BOX_WIDTH, y_offset + BOX_HEIGHT - 1], fill=(0, 0, 0, 180))
-            f1 = small_font if t1 in TEAMS_FOR_SMALLER_FONT else font
-            lines1 = wrap_text(t1, f1, TEAM_BOX_WIDTH - 20, d)
-            h1 = get_wrapped_text_block_height(lines1, f1, LINE_SPACING, d)
-            start_y1 = y_offset + (BOX_HEIGHT - h1) // 2 + VISUAL_Y_OFFSET_CORRECTION
-            cur_y = start_y1
-            for line in lines1:
-                bbox = d.textbbox((0, 0), line, font=f1)
-                lx = x1 + (TEAM_BOX_WIDTH - (bbox[2] - bbox[0])) // 2
-                d.text((lx, cur_y), line, fill=(255, 255, 255), font=f1)
-                cur_y += (bbox[3] - bbox[1]) + LINE_SPACING
-
-            # Score
-            sx = x1 + TEAM_BOX_WIDTH + 5
-            d.rectangle([sx, y_offset, sx + SCORE_BOX_WIDTH, y_offset + BOX_HEIGHT - 1], fill=(0, 0, 0, 180))
-            score_text = f"{s1} - {s2}"
-            sbox = d.textbbox((0, 0), score_text, font=score_font)
-            if div_name.lower() == "cup" and pen:
-                reg_y = y_offset + 8
-                d.text((sx + (SCORE_BOX_WIDTH - (sbox[2] - sbox[0])) // 2, reg_y), score_text, fill=(255, 255, 255), font=score_font)
-                label = "PENALTIES"
-                lb = d.textbbox((0, 0), label, font=label_font)
-                ly = reg_y + (sbox[3] - sbox[1]) + 12
-                d.text((sx + (SCORE_BOX_WIDTH - (lb[2] - lb[0])) // 2, ly), label, fill=(255, 255, 0), font=label_font)
-                pb = d.textbbox((0, 0), pen, font=penalty_font)
-                py = ly + (lb[3] - lb[1]) + 8
-                d.text((sx + (SCORE_BOX_WIDTH - (pb[2] - pb[0])) // 2, py), pen, fill=(255, 255, 255), font=penalty_font)
-            else:
-                d.text((sx + (SCORE_BOX_WIDTH - (sbox[2] - sbox[0])) // 2, y_offset + (BOX_HEIGHT - (sbox[3] - sbox[1])) // 2), score_text, fill=(255, 255, 255), font=score_font)
-
-            # Team 2
-            x2 = sx + SCORE_BOX_WIDTH + 5
-            d.rectangle([x2, y_offset, x2 + TEAM_BOX_WIDTH, y_offset + BOX_HEIGHT - 1], fill=(0, 0, 0, 180))
-            f2 = small_font if t2 in TEAMS_FOR_SMALLER_FONT else font
-            lines2 = wrap_text(t2, f2, TEAM_BOX_WIDTH - 20, d)
-            h2 = get_wrapped_text_block_height(lines2, f2, LINE_SPACING, d)
-            start_y2 = y_offset + (BOX_HEIGHT - h2) // 2 + VISUAL_Y_OFFSET_CORRECTION
-            cur_y = start_y2
-            for line in lines2:
-                bbox = d.textbbox((0, 0), line, font=f2)
-                lx = x2 + (TEAM_BOX_WIDTH - (bbox[2] - bbox[0])) // 2
-                d.text((lx, cur_y), line, fill=(255, 255, 255), font=f2)
-                cur_y += (bbox[3] - bbox[1]) + LINE_SPACING
-            img.paste(logo2, (x2 + TEAM_BOX_WIDTH + 2, int(y_offset) + 1), logo2)
+            draw_result_row(img, d, match, div_name, y_offset, logos_folder, fonts)
+            rows.append((div_name, match, y_offset))
 
             y_offset += BOX_HEIGHT
         is_first = False
 
+    return img, rows
+
+
+def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folder: str, save_folder: str, part_number: int, template_path: str, current_date: datetime, font_path: str = FONT_PATH):
+    img, _ = render_results_part(sections_to_draw, logos_folder, template_path, current_date, font_path)
+
     # Save
     os.makedirs(save_folder, exist_ok=True)
     time_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -343,34 +397,11 @@ def create_match_graphic_with_heading(sections_to_draw: list[tuple], logos_folde
     return path  # Return for Streamlit
 
 
-# --- MAIN LOGIC WITH FIXTURES-STYLE LEAGUE GROUPING ---
-def generate_results_graphics(file_path: str, logos_folder: str, save_folder: str, template_path: str):
-    # Date
-    try:
-        df = pd.read_excel(file_path, sheet_name='Date')
-        if not df.empty and 'Date' in df.columns:
-            date_str = str(df['Date'].iloc[0]).strip()
-            current_date = pd.to_datetime(date_str, errors='coerce')
-            if pd.isna(current_date):
-                raise ValueError()
-            print(f"Date parsed: {current_date.strftime('%d %B %Y')}")
-        else:
-            raise ValueError()
-    except Exception as e:
-        print(f"Date error: {e}. Using now.")
-        current_date = datetime.now()
-
-    # Load data
-    cup_matches = parse_matches_from_file(file_path, "Cup")
-    league_divisions_map = {}
-    for div in LEAGUE_DIVISION_ORDER:
-        matches = parse_matches_from_file(file_path, div)
-        if matches:
-            league_divisions_map[div] = {'division': div, 'matches': matches}
-
-    # Reconstruct in fixed order
-    league_divisions = [league_divisions_map[div] for div in LEAGUE_DIVISION_ORDER if div in league_divisions_map]
-
+def plan_result_pages(cup_matches: list, league_divisions: list[dict]) -> list[list[tuple]]:
+    """
+    Splits the cup and league matches into parts before anything is drawn.
+    Returns one list of (division name, matches) sections per part.
+    """
     # Group cups
     cup_groups = defaultdict(list)
     for m in cup_matches:
@@ -381,12 +412,13 @@ def generate_results_graphics(file_path: str, logos_folder: str, save_folder: st
 
     part_number = 1
     trophy_included = False
-    saved_paths = []
+    pages = []  # Sections for each part, planned before anything is drawn
 
     # === CUP GRAPHICS ===
     remaining_cup = cup_divisions.copy()
     print("\n=== CUP GRAPHICS ===")
     while remaining_cup:
+        checkpoint()
         sections = []
         height = 0
         next_cup = []
@@ -435,8 +467,7 @@ def generate_results_graphics(file_path: str, logos_folder: str, save_folder: st
                     next_cup.append(div)
         if sections:
             print(f"Final Cup Part {part_number}: {[s[0] for s in sections]}, {height}px")
-            path = create_match_graphic_with_heading(sections, logos_folder, save_folder, part_number, template_path, current_date)
-            saved_paths.append(path)
+            pages.append(sections)
             part_number += 1
         remaining_cup = next_cup
         if not next_cup and sections:
@@ -474,8 +505,7 @@ def generate_results_graphics(file_path: str, logos_folder: str, save_folder: st
             d3_in_g1 = True
     if g1_sections:
         print(f"\n--- League Graphic {part_number}: {[s[0] for s in g1_sections]}, {g1_height}px ---")
-        path = create_match_graphic_with_heading(g1_sections, logos_folder, save_folder, part_number, template_path, current_date)
-        saved_paths.append(path)
+        pages.append(g1_sections)
         part_number += 1
 
     # PART 2: Remaining divisions
@@ -489,6 +519,7 @@ def generate_results_graphics(file_path: str, logos_folder: str, save_folder: st
 
     # PART 3: Greedy for rest
     while remaining_league:
+        checkpoint()
         sections = []
         height = 0
         next_league = []
@@ -505,14 +536,63 @@ def generate_results_graphics(file_path: str, logos_folder: str, save_folder: st
                 next_league.append(div)
         if sections:
             print(f"Final League Part {part_number}: {[s[0] for s in sections]}, {height}px")
-            path = create_match_graphic_with_heading(sections, logos_folder, save_folder, part_number, template_path, current_date)
-            saved_paths.append(path)
+            pages.append(sections)
             part_number += 1
         remaining_league = next_league
         if not next_league and sections:
             break
+    return pages
+
+
+# --- MAIN LOGIC WITH FIXTURES-STYLE LEAGUE GROUPING ---
+def generate_results_graphics(file_path: str, logos_folder: str, save_folder: str, template_path: str, font_path: str = FONT_PATH, progress_callback=None, workbook=None):
+    if workbook is not None:
+        print("Using pre-parsed workbook data.")
+        current_date = workbook.date if workbook.date is not None else datetime.now()
+        load_matches = workbook.matches
+    else:
+        load_matches = partial(parse_matches_from_file, file_path)
+        # Date
+        try:
+            df = pd.read_excel(file_path, sheet_name='Date')
+            if not df.empty and 'Date' in df.columns:
+                date_str = str(df['Date'].iloc[0]).strip()
+                current_date = pd.to_datetime(date_str, errors='coerce')
+                if pd.isna(current_date):
+                    raise ValueError()
+                print(f"Date parsed: {current_date.strftime('%d %B %Y')}")
+            else:
+                raise ValueError()
+        except Exception as e:
+            print(f"Date error: {e}. Using now.")
+            current_date = datetime.now()
+
+    # Load data
+    cup_matches = load_matches("Cup")
+    league_divisions_map = {}
+    for div in LEAGUE_DIVISION_ORDER:
+        matches = load_matches(div)
+        if matches:
+            league_divisions_map[div] = {'division': div, 'matches': matches}
+
+    # Reconstruct in fixed order
+    league_divisions = [league_divisions_map[div] for div in LEAGUE_DIVISION_ORDER if div in league_divisions_map]
+
+    pages = plan_result_pages(cup_matches, league_divisions)
+
+    # === RENDER PLANNED PARTS ===
+    # Planning first means the total is known, so progress can be reported as
+    # "Part N of M" and each part can be shown as soon as it is saved.
+    saved_paths = []
+    total_parts = len(pages)
+    for part_number, sections in enumerate(pages, start=1):
+        checkpoint()
+        path = create_match_graphic_with_heading(sections, logos_folder, save_folder, part_number, template_path, current_date, font_path)
+        saved_paths.append(path)
+        if progress_callback:
+            progress_callback(part_number, total_parts, path)
 
-    print(f"\nCompleted: {part_number - 1} graphic(s) generated")
+    print(f"\nCompleted: {len(saved_paths)} graphic(s) generated")
     return saved_paths
 
 
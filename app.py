@@ -1,184 +1,525 @@
-import streamlit as st
-import os
-import shutil
-import subprocess
-import glob
-import sys
-import pandas as pd
-import zipfile
-from datetime import datetime
-
-# --- Configuration for Git Repository Files ---
-GIT_FILES_TO_COPY = [
-    "match of the day.xlsx",
-    "results.xlsx",
-    "table.xlsx",
-    "Fixtures - automated.py",
-    "match of the day - automated.py",
-    "Results - automated.py",
-    "table - automated.py",
-    "BebasNeue Regular.ttf",
-    "BebasKai.ttf",
-]
-GIT_DIRS_TO_COPY = [
-    "Logos",
-    "Templates",
-]
-
-# ----------------------------------------------
-# Streamlit GUI
-st.title("⚽ Football Graphics Generator")
-st.write("Using files and scripts directly from the deployed GitHub repository.")
-
-# --- File Setup Block: Copies Files from Git Repo to Tmp Folder ---
-project_dir = os.path.join("tmp", "project")
-if os.path.exists(project_dir):
-    shutil.rmtree(project_dir)
-os.makedirs(project_dir, exist_ok=True)
-repo_root = os.getcwd()
-
-# Copy individual files
-all_files_present = True
-for item in GIT_FILES_TO_COPY:
-    source_path = os.path.join(repo_root, item)
-    dest_path = os.path.join(project_dir, item)
-    if os.path.exists(source_path):
-        shutil.copy2(source_path, dest_path)
-        # Set file permissions for font and .xlsx files
-        if item.endswith((".ttf", ".otf", ".xlsx")):
-            try:
-                os.chmod(dest_path, 0o777)
-                st.write(f"DEBUG: Copied and set permissions for {item} to {dest_path}")
-            except Exception as e:
-                st.warning(f"Warning: Could not set permissions for {item}. {e}")
-    else:
-        st.error(f"FATAL ERROR: Required file not found in Git repository: {item}")
-        all_files_present = False
-
-# Copy folders
-for item in GIT_DIRS_TO_COPY:
-    source_path = os.path.join(repo_root, item)
-    dest_path = os.path.join(project_dir, item)
-    if os.path.exists(source_path):
-        shutil.copytree(source_path, dest_path)
-        st.write(f"DEBUG: Copied directory {item} to {dest_path}")
-    else:
-        st.error(f"FATAL ERROR: Required directory not found in Git repository: {item}")
-        all_files_present = False
-
-if not all_files_present:
-    st.stop()
-else:
-    st.success("Project files loaded successfully from the Git repository.")
-
-# --- Download Excel Files Section ---
-st.subheader("Download Excel Files for Editing")
-xlsx_files = [f for f in os.listdir(project_dir) if f.endswith('.xlsx')]
-if not xlsx_files:
-    st.warning("No Excel files found in the project directory.")
-else:
-    for xlsx in xlsx_files:
-        xlsx_path = os.path.join(project_dir, xlsx)
-        try:
-            mtime = datetime.fromtimestamp(os.path.getmtime(xlsx_path))
-            st.write(f"DEBUG: {xlsx} last modified: {mtime.strftime('%Y-%m-%d %H:%M:%S')}")
-            with open(xlsx_path, "rb") as f:
-                st.download_button(
-                    label=f"Download {xlsx}",
-                    data=f,
-                    file_name=xlsx,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-        except Exception as e:
-            st.error(f"Error providing download for {xlsx}: {e}")
-
-# --- Upload Updated Excel Files Section ---
-st.subheader("Upload Updated Excel Files")
-uploaded_files = st.file_uploader("Upload edited .xlsx files (multiple allowed)", type=["xlsx"], accept_multiple_files=True)
-if uploaded_files:
-    for uploaded_file in uploaded_files:
-        try:
-            # Validate file name
-            if uploaded_file.name not in ["match of the day.xlsx", "results.xlsx", "table.xlsx"]:
-                st.warning(f"Warning: {uploaded_file.name} is not a recognized Excel file. It will still be saved.")
-            # Save uploaded file to project_dir
-            uploaded_path = os.path.join(project_dir, uploaded_file.name)
-            with open(uploaded_path, "wb") as f:
-                f.write(uploaded_file.getvalue())
-            # Set permissions
-            os.chmod(uploaded_path, 0o777)
-            mtime = datetime.fromtimestamp(os.path.getmtime(uploaded_path))
-            st.success(f"Uploaded {uploaded_file.name} to {uploaded_path} (last modified: {mtime.strftime('%Y-%m-%d %H:%M:%S')})")
-        except Exception as e:
-            st.error(f"Error uploading {uploaded_file.name}: {e}")
-
-# --- Graphic Generation ---
-graphics_dir = os.path.join(project_dir, "Graphics")
-os.makedirs(graphics_dir, exist_ok=True)
-try:
-    os.chmod(graphics_dir, 0o777)
-    st.write(f"DEBUG: Set permissions for {graphics_dir} to 0o777")
-except Exception as e:
-    st.warning(f"Warning: Could not set permissions for Graphics folder. {e}")
-
-mode = st.selectbox("Select Graphic Type", ["Fixtures", "Match of the Day", "Results", "Table"])
-script_map = {
-    "Fixtures": "Fixtures - automated.py",
-    "Match of the Day": "match of the day - automated.py",
-    "Results": "Results - automated.py",
-    "Table": "table - automated.py"
-}
-selected_script = script_map[mode]
-script_path_in_project = os.path.join(project_dir, selected_script)
-
-if not os.path.exists(script_path_in_project):
-    st.error(f"Error: {selected_script} not found in project folder!")
-    st.stop()
-
-if st.button(f"Generate {mode} Graphics"):
-    with st.spinner(f"Generating {mode} graphics..."):
-        original_cwd = os.getcwd()
-        os.chdir(project_dir)  # Change to tmp/project
-        try:
-            env = os.environ.copy()
-            env["PYTHONIOENCODING"] = "utf-8"
-            result = subprocess.run([sys.executable, selected_script], capture_output=True, text=True, env=env)
-            st.write("**Console Output:**")
-            st.code(result.stdout)
-            if result.stderr:
-                st.error(f"**Errors:**\n{result.stderr}")
-            else:
-                st.success(f"{mode} graphics generated successfully!")
-        except Exception as e:
-            st.error(f"Error running script: {e}")
-        finally:
-            os.chdir(original_cwd)
-    
-    # Provide download links for generated PNGs and ZIP
-    if os.path.exists(graphics_dir):
-        png_files = glob.glob(os.path.join(graphics_dir, "*.png"))
-        if png_files:
-            st.write("**Download Generated Graphics:**")
-            for png in png_files:
-                with open(png, "rb") as f:
-                    st.download_button(
-                        label=f"Download {os.path.basename(png)}",
-                        data=f,
-                        file_name=os.path.basename(png),
-                        mime="image/png"
-                    )
-            zip_path = os.path.join("tmp", "graphics.zip")
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for png in png_files:
-                    zipf.write(png, os.path.join("Graphics", os.path.basename(png)))
-            with open(zip_path, "rb") as f:
-                st.download_button(
-                    label="Download All Graphics as ZIP",
-                    data=f,
-                    file_name="graphics.zip",
-                    mime="application/zip"
-                )
-        else:
-            st.warning("No PNGs found in Graphics folder.")
-    else:
-        st.error("Graphics folder not created. Check script errors.")
+import streamlit as st
+import os
+import html
+import uuid
+import pandas as pd
+from datetime import datetime
+from workspace import SessionWorkspace, sync_workspace, open_session_workspace, prune_session_workspaces, file_digest
+from engine import GENERATOR_SCRIPTS, GeneratorEngine
+from assets import use_asset_pack, use_logo_disk_cache, use_logo_atlas
+from asset_pack import open_asset_pack, open_logo_atlas
+from jobs import JobRunner, QueueFullError
+from bundle import get_zip_bundle
+from gallery import get_thumbnail
+from manifest import manifest_outputs
+from preview import ResultsPreview
+from logo_coverage import check_logo_coverage
+from publish import publish_output, publish_bytes, prune_published
+from workbooks import (
+    RESULTS_WORKBOOK, WorkbookError, editable_frame, export_workbook, get_workbook,
+    load_workbook_file, results_workbook_from_frames, workbook_digest,
+)
+
+# --- Configuration for Git Repository Files ---
+WORKBOOK_FILES = [
+    "match of the day.xlsx",
+    "results.xlsx",
+    "table.xlsx",
+]
+GIT_FILES_TO_COPY = WORKBOOK_FILES + [
+    "BebasNeue Regular.ttf",
+    "BebasKai.ttf",
+]
+GIT_DIRS_TO_COPY = [
+    "Logos",
+    "Templates",
+]
+# Graphic types that are drawn from results.xlsx, and so from the in-browser editor
+RESULTS_EDITOR_MODES = ["Fixtures", "Results"]
+PREVIEW_WIDTH = 540  # Half size, the preview only has to be readable
+LIVE_LOG_LINES = 30  # Tail of the console shown while a job runs
+JOB_DB_FILENAME = "jobs.sqlite3"
+
+# --- Warm Generator Engines ---
+# Each generator module is imported once per server process and reused by every
+# click, so pandas/Pillow imports, fonts, templates and logos stay loaded.
+@st.cache_resource(show_spinner=False)
+def get_engine(mode: str) -> GeneratorEngine:
+    return GeneratorEngine(mode, os.path.dirname(os.path.abspath(__file__)))
+
+# --- Background Job Runner ---
+# Shared by all sessions; generation runs on its worker threads, not the script thread.
+# The queue is bounded (see GRAPHICS_MAX_WORKERS / GRAPHICS_MAX_QUEUED_JOBS) and the
+# job table lives in tmp/jobs.sqlite3.
+@st.cache_resource(show_spinner=False)
+def get_job_runner() -> JobRunner:
+    tmp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    return JobRunner(db_path=os.path.join(tmp_dir, JOB_DB_FILENAME))
+
+# --- Project File Sync ---
+# Runs once per server process (a redeploy restarts the process), not on every rerun.
+@st.cache_resource(show_spinner=False)
+def sync_project_files(repo_root: str, project_dir: str) -> dict:
+    return sync_workspace(repo_root, project_dir, GIT_FILES_TO_COPY, GIT_DIRS_TO_COPY)
+
+# --- Packed Assets ---
+# Fonts and templates are packed (pre-decoded) into one memory-mapped file, rebuilt
+# only when the synced assets change. Without it the scripts read the loose files.
+# Logos are left out: the logo atlases below serve every logo size the generators use.
+@st.cache_resource(show_spinner="Packing templates and fonts...")
+def load_asset_pack(project_dir: str):
+    try:
+        pack = open_asset_pack(project_dir, include_logos=False)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not use the asset pack. {e}")
+        pack = None
+    use_asset_pack(pack)
+    return pack
+
+# --- Logo Atlases ---
+# One memory-mapped file per logo size in use, holding every logo ready to paste.
+# Loads each generator once up front to learn its logo size.
+@st.cache_resource(show_spinner="Packing logo atlases...")
+def load_logo_atlases(project_dir: str) -> list:
+    sizes = set()
+    for mode in GENERATOR_SCRIPTS:
+        try:
+            sizes.add(get_engine(mode).logo_size)
+        except Exception as e:
+            print(f"Warning: Could not load {GENERATOR_SCRIPTS[mode]} to size its logo atlas. {e}")
+    atlases = []
+    for size in sorted(sizes):
+        try:
+            atlas = open_logo_atlas(project_dir, size)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not use the {size[0]}x{size[1]} logo atlas. {e}")
+            continue
+        use_logo_atlas(atlas)
+        atlases.append(atlas)
+    return atlases
+
+# --- Resized Logo Cache ---
+# Logos resized for each graphic type are kept on disk, so a restarted process
+# does not resample the full-size originals again.
+@st.cache_resource(show_spinner=False)
+def enable_logo_disk_cache(cache_dir: str):
+    try:
+        use_logo_disk_cache(cache_dir)
+    except OSError as e:
+        print(f"Warning: Could not use the resized logo cache. {e}")
+
+# --- Workbook Bytes for Downloads ---
+# Keyed by modification time, so a workbook is read again only after it changes.
+@st.cache_data(show_spinner=False, max_entries=16)
+def read_file_bytes(path: str, mtime_ns: int) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+# --- Published Output Pruning ---
+# Cached for an hour, so the static folder is trimmed at most hourly per process.
+@st.cache_resource(show_spinner=False, ttl=60 * 60)
+def prune_published_outputs(app_root: str) -> list[str]:
+    return prune_published(app_root)
+
+# --- Session Workspace Pruning ---
+# Cached for an hour, so abandoned session folders are removed within an hour of turning a day old.
+@st.cache_resource(show_spinner=False, ttl=60 * 60)
+def prune_stale_sessions(sessions_root: str) -> list[str]:
+    return prune_session_workspaces(sessions_root)
+
+# ----------------------------------------------
+# Streamlit GUI
+st.title("⚽ Football Graphics Generator")
+st.write("Using files and scripts directly from the deployed GitHub repository.")
+
+# --- File Setup Block: Syncs Files from Git Repo to a Persistent Workspace ---
+# Only files whose size/mtime/content changed are copied, once per server process,
+# and uploaded workbooks are preserved.
+repo_root = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.join(repo_root, "tmp", "project")
+sessions_root = os.path.join(repo_root, "tmp", "sessions")
+
+sync_report = sync_project_files(repo_root, project_dir)
+load_asset_pack(project_dir)
+load_logo_atlases(project_dir)
+enable_logo_disk_cache(os.path.join(repo_root, "tmp", "logo_cache"))
+all_files_present = True
+for item in sync_report["missing"]:
+    st.error(f"FATAL ERROR: Required file or directory not found in Git repository: {item}")
+    all_files_present = False
+st.write(
+    f"DEBUG: Workspace sync copied {len(sync_report['copied'])} file(s), "
+    f"{len(sync_report['unchanged'])} unchanged, {len(sync_report['removed'])} removed"
+)
+
+if not all_files_present:
+    st.stop()
+else:
+    st.success("Project files loaded successfully from the Git repository.")
+
+# --- Per-Session Workspace ---
+# Shared assets stay in tmp/project (read-only); each browser session gets its own
+# folder for uploaded workbooks and generated graphics.
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
+prune_stale_sessions(sessions_root)
+prune_published_outputs(repo_root)
+workspace = open_session_workspace(sessions_root, st.session_state["session_id"], project_dir)
+if not st.session_state.get("graphics_dir_ready"):
+    # Permissions only need setting once per session
+    try:
+        os.chmod(workspace.graphics_dir, 0o777)
+        st.write(f"DEBUG: Set permissions for {workspace.graphics_dir} to 0o777")
+        st.session_state["graphics_dir_ready"] = True
+    except Exception as e:
+        st.warning(f"Warning: Could not set permissions for Graphics folder. {e}")
+
+# ----------------------------------------------
+# Each section below is a fragment: interacting with it reruns only that section.
+
+# --- Download Excel Files Section ---
+# Clicking a download does not rerun anything, and file bytes are cached per mtime.
+@st.fragment
+def workbook_downloads(workspace: SessionWorkspace):
+    st.subheader("Download Excel Files for Editing")
+    xlsx_files = [f for f in WORKBOOK_FILES if os.path.exists(workspace.workbook(f))]
+    if not xlsx_files:
+        st.warning("No Excel files found in the project directory.")
+        return
+    for xlsx in xlsx_files:
+        xlsx_path = workspace.workbook(xlsx)
+        try:
+            stat = os.stat(xlsx_path)
+            mtime = datetime.fromtimestamp(stat.st_mtime)
+            st.write(f"DEBUG: {xlsx} last modified: {mtime.strftime('%Y-%m-%d %H:%M:%S')}")
+            st.download_button(
+                label=f"Download {xlsx}",
+                data=read_file_bytes(xlsx_path, stat.st_mtime_ns),
+                file_name=xlsx,
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                on_click="ignore"
+            )
+        except Exception as e:
+            st.error(f"Error providing download for {xlsx}: {e}")
+
+# --- Upload Updated Excel Files Section ---
+# A newly saved workbook reruns the whole page so the editor and downloads pick it up.
+@st.fragment
+def workbook_uploads(workspace: SessionWorkspace):
+    st.subheader("Upload Updated Excel Files")
+    uploaded_files = st.file_uploader("Upload edited .xlsx files (multiple allowed)", type=["xlsx"], accept_multiple_files=True)
+    if not uploaded_files:
+        return
+    saved_digests = st.session_state.setdefault("uploaded_digests", {})
+    saved_new_file = False
+    for uploaded_file in uploaded_files:
+        try:
+            data = uploaded_file.getvalue()
+            # Validate file name
+            if uploaded_file.name not in WORKBOOK_FILES:
+                st.warning(f"Warning: {uploaded_file.name} is not a recognized Excel file. It will still be saved.")
+            else:
+                # Parse straight from the upload buffer; the model is cached by content
+                # hash, so generation with the same data never re-reads the Excel file
+                try:
+                    parsed_workbook = get_workbook(uploaded_file.name, data)
+                except WorkbookError as e:
+                    st.error(f"{uploaded_file.name} was not saved: {e}")
+                    continue
+                for warning in parsed_workbook.warnings:
+                    st.warning(f"{uploaded_file.name}: {warning}")
+            # Save uploaded file to this session's workspace only (once per distinct upload)
+            digest = workbook_digest(data)
+            uploaded_path = os.path.join(workspace.root, os.path.basename(uploaded_file.name))
+            if saved_digests.get(uploaded_file.name) != digest or not os.path.exists(uploaded_path):
+                uploaded_path = workspace.save_upload(uploaded_file.name, data)
+                # Set permissions
+                os.chmod(uploaded_path, 0o777)
+                saved_digests[uploaded_file.name] = digest
+                saved_new_file = True
+            mtime = datetime.fromtimestamp(os.path.getmtime(uploaded_path))
+            st.success(f"Uploaded {uploaded_file.name} to {uploaded_path} (last modified: {mtime.strftime('%Y-%m-%d %H:%M:%S')})")
+        except Exception as e:
+            st.error(f"Error uploading {uploaded_file.name}: {e}")
+    if saved_new_file:
+        st.rerun()
+
+
+# --- Edit Results and Fixtures in the Browser ---
+# The edited sheets go straight into the results model used by the Fixtures and
+# Results generators, so an edit-render loop never writes or re-reads an .xlsx file.
+# Editing a cell reruns only this section.
+@st.fragment
+def results_editor(workspace: SessionWorkspace):
+    st.subheader("Edit Results and Fixtures")
+    st.session_state["edited_results"] = None
+    results_path = workspace.workbook(RESULTS_WORKBOOK)
+    try:
+        base_results = load_workbook_file(results_path)
+    except (WorkbookError, OSError) as e:
+        st.error(f"Could not load {RESULTS_WORKBOOK} for editing: {e}")
+        return
+
+    # Editors are keyed by the workbook's content hash, so a new upload resets them
+    results_digest = file_digest(results_path)
+    sheet_tabs = st.tabs(list(base_results.sheets))
+    edited_sheets = {}
+    for tab, (sheet_name, sheet) in zip(sheet_tabs, base_results.sheets.items()):
+        with tab:
+            edited_sheets[sheet_name] = st.data_editor(
+                editable_frame(sheet),
+                num_rows="dynamic",
+                hide_index=True,
+                key=f"editor_{results_digest}_{sheet_name}"
+            )
+    try:
+        edited_results = results_workbook_from_frames(edited_sheets)
+        for warning in edited_results.warnings:
+            st.warning(f"Editor: {warning}")
+    except WorkbookError as e:
+        st.error(f"Edited scores cannot be used, so the saved {RESULTS_WORKBOOK} will be: {e}")
+        edited_results = None
+    st.session_state["edited_results"] = edited_results
+
+    # Saving back to .xlsx is optional and only done on request
+    if st.button(f"Export edits as {RESULTS_WORKBOOK}"):
+        st.session_state["results_export"] = export_workbook(edited_sheets)
+    if "results_export" in st.session_state:
+        st.download_button(
+            label=f"Download edited {RESULTS_WORKBOOK}",
+            data=st.session_state["results_export"],
+            file_name=RESULTS_WORKBOOK,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            on_click="ignore"
+        )
+
+    if edited_results is not None and st.toggle("Live preview of Results graphics"):
+        show_results_preview(workspace, edited_results)
+
+
+# --- Live Results Preview ---
+# Editing a cell reruns the editor once the edit is committed (not on every
+# keystroke); only the part holding that match is touched, and usually only its row.
+def show_results_preview(workspace: SessionWorkspace, edited_results):
+    results_module = get_engine("Results").module
+    preview = st.session_state.get("results_preview")
+    if preview is None or preview.module is not results_module:
+        preview = ResultsPreview(
+            results_module,
+            workspace.logos_dir,
+            os.path.join(workspace.templates_dir, os.path.basename(results_module.TEMPLATE_PATH)),
+            workspace.asset(os.path.basename(results_module.FONT_PATH)),
+        )
+        st.session_state["results_preview"] = preview
+    dirty_parts = preview.update(edited_results)
+    if not preview.images:
+        return
+    part_numbers = list(range(1, len(preview.images) + 1))
+    if dirty_parts:
+        # Jump to the part that was just edited
+        st.session_state["preview_part"] = dirty_parts[0]
+    elif st.session_state.get("preview_part") not in part_numbers:
+        st.session_state["preview_part"] = 1
+    part = st.selectbox("Preview part", part_numbers, key="preview_part")
+    st.image(preview.images[part - 1], width=PREVIEW_WIDTH)
+    st.caption(f"Updated part(s) {dirty_parts or 'none'} in {preview.last_update_seconds * 1000:.0f} ms")
+
+
+# --- Logo Coverage Check ---
+# Resolves every team in the session's workbooks against the logos in one batch,
+# so a missing crest shows up here instead of as a generic logo in a graphic.
+# Reports are cached per workbook content; rerunning the check is cheap.
+@st.fragment
+def logo_coverage_panel(workspace: SessionWorkspace):
+    with st.expander("Logo Coverage Check"):
+        for name in WORKBOOK_FILES:
+            if name == RESULTS_WORKBOOK and st.session_state.get("edited_results") is not None:
+                workbook = st.session_state["edited_results"]
+            else:
+                try:
+                    workbook = load_workbook_file(workspace.workbook(name))
+                except (WorkbookError, OSError) as e:
+                    st.warning(f"{name}: could not be checked: {e}")
+                    continue
+            coverage = check_logo_coverage(workspace.logos_dir, workbook)
+            st.write(f"**{name}:** {coverage.summary()}")
+            issues = coverage.missing + coverage.ambiguous + coverage.aliased + coverage.fuzzy
+            if issues:
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            "Team": match.team_name,
+                            "Status": "ambiguous" if match.ambiguous else "missing" if match.method == "none" else match.method,
+                            "Logo": os.path.basename(match.path) if match.path else None,
+                            "Score": round(match.score, 2),
+                            "Could be": ", ".join(os.path.basename(path) for path in match.alternatives),
+                        }
+                        for match in dict.fromkeys(issues)
+                    ]),
+                    hide_index=True
+                )
+        # Clicking reruns just this section, picking up edits made in the editor
+        st.button("Check Again")
+
+
+def workbook_for(graphic_mode: str):
+    """
+    Returns the edited results model for the graphic types that read results.xlsx, else None.
+    """
+    return st.session_state.get("edited_results") if graphic_mode in RESULTS_EDITOR_MODES else None
+
+
+# --- Output Gallery ---
+# Small thumbnails cached per output hash; only the graphic picked for download
+# is read at full size, so rerun cost does not grow with the number of outputs.
+def show_gallery(outputs: list[tuple[str, str]], columns: int = 3):
+    outputs = [(path, digest) for path, digest in outputs if digest and os.path.exists(path)]
+    if not outputs:
+        return
+    cols = st.columns(columns)
+    for i, (path, digest) in enumerate(outputs):
+        cols[i % columns].image(get_thumbnail(path, digest), caption=os.path.basename(path))
+
+
+# --- Static Download Links ---
+# Full-size graphics are published under content-hashed names in ./static and
+# linked by URL: the browser fetches (and caches) only the files it asks for.
+def show_download_links(outputs: list[tuple[str, str]]):
+    links = []
+    for path, digest in outputs:
+        if os.path.exists(path):
+            url = publish_output(path, digest, repo_root)
+            links.append(f'<a href="{url}" download="{html.escape(os.path.basename(path))}">{html.escape(os.path.basename(path))}</a>')
+    if links:
+        st.markdown("<br>".join(links), unsafe_allow_html=True)
+
+
+# --- Console Log ---
+# Each line is stamped with the time since the job started, so slow stages stand out.
+def format_job_log(snapshot: dict, max_lines: int = None) -> str:
+    started_at = snapshot["started_at"] or snapshot["submitted_at"]
+    lines = snapshot["log"][-max_lines:] if max_lines else snapshot["log"]
+    return "\n".join(f"+{entry['time'] - started_at:7.2f}s  {entry['line']}" for entry in lines)
+
+
+# --- Live Job Progress ---
+# Polls the background jobs once a second; each part is previewed the moment
+# it is saved. When every job finishes the whole page reruns once to show downloads.
+@st.fragment(run_every=1.0)
+def show_job_progress(workspace: SessionWorkspace, job_ids: list[str]):
+    runner = get_job_runner()
+    jobs = [job for job in (runner.get(job_id) for job_id in job_ids) if job is not None]
+    for job in jobs:
+        snapshot = job.snapshot()
+        if snapshot["total_parts"]:
+            done = len(snapshot["paths"])
+            st.progress(done / snapshot["total_parts"], text=f"{snapshot['mode']}: {done} of {snapshot['total_parts']} part(s) rendered")
+        elif snapshot["status"] == "queued":
+            position = runner.queue_position(job.id)
+            st.progress(0.0, text=f"{snapshot['mode']}: waiting in queue (position {position})" if position else f"{snapshot['mode']}: queued...")
+        else:
+            st.progress(0.0, text=f"{snapshot['mode']}: {snapshot['status']}...")
+        if not job.finished and not job.budget.cancelled:
+            if st.button(f"Cancel {snapshot['mode']}", key=f"cancel_{job.id}") and runner.cancel(job.id, workspace):
+                if not job.budget.cancelled:
+                    # Other sessions are still waiting on the job, so this session just stops following it
+                    st.session_state["job_ids"] = [job_id for job_id in job_ids if job_id != job.id]
+                    st.rerun()
+        for event in snapshot["events"]:
+            st.write(f"{datetime.fromtimestamp(event['time']).strftime('%H:%M:%S')} - {event['message']}")
+        if snapshot["log"]:
+            # Console output so far, streamed line by line while the job runs
+            st.code(format_job_log(snapshot, max_lines=LIVE_LOG_LINES))
+        show_gallery(snapshot["outputs"])
+    if all(job.finished for job in jobs):
+        st.rerun()
+
+
+def show_run_results(jobs: list):
+    run_outputs = []
+    for job in jobs:
+        snapshot = job.snapshot()
+        st.write(f"**{snapshot['mode']} Console Output:**")
+        st.code(format_job_log(snapshot) if snapshot["log"] else snapshot["stdout"])
+        if snapshot["status"] == "cancelled":
+            st.warning(f"{snapshot['mode']} generation stopped: {snapshot['error']} Partial graphics were removed.")
+        elif snapshot["error"]:
+            st.error(f"**Errors:**\n{snapshot['error']}")
+        else:
+            st.success(f"{snapshot['mode']} graphics generated successfully in {snapshot['finished_at'] - snapshot['started_at']:.1f}s!")
+        # Only the files recorded in this run's manifest, never the rest of the Graphics folder
+        manifest = snapshot["manifest"]
+        if manifest and manifest["files"]:
+            st.caption(f"{len(manifest['files'])} file(s), {manifest['total_bytes'] / 1024:.0f} KB")
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "File": os.path.basename(entry["path"]),
+                        "Size (KB)": round(entry["size"] / 1024, 1),
+                        "Render time (s)": None if entry["render_seconds"] is None else round(entry["render_seconds"], 2),
+                    }
+                    for entry in manifest["files"]
+                ]),
+                hide_index=True
+            )
+            outputs = manifest_outputs(manifest)
+            show_gallery(outputs)
+            run_outputs.extend(outputs)
+
+    # Lazy full-size downloads for this run's outputs, plus one ZIP of everything
+    if run_outputs:
+        st.write("**Download Generated Graphics:**")
+        show_download_links(run_outputs)
+        zip_url = publish_bytes(get_zip_bundle(run_outputs), ".zip", repo_root)
+        st.markdown(f'<a href="{zip_url}" download="graphics.zip">Download All Graphics from This Run as ZIP</a>', unsafe_allow_html=True)
+    else:
+        st.warning("No graphics were produced by this run. Check the console output above.")
+
+
+# --- Graphic Generation ---
+# Changing the graphic type or picking a graphic to download reruns only this section.
+@st.fragment
+def generation_panel(workspace: SessionWorkspace):
+    mode = st.selectbox("Select Graphic Type", list(GENERATOR_SCRIPTS))
+    try:
+        engine = get_engine(mode)
+    except Exception as e:
+        st.error(f"Error: Could not load {GENERATOR_SCRIPTS[mode]}: {e}")
+        return
+
+    runner = get_job_runner()
+    generate_col, generate_all_col = st.columns(2)
+    if generate_col.button(f"Generate {mode} Graphics"):
+        try:
+            st.session_state["job_ids"] = [runner.submit(engine, workspace, workbook_for(mode)).id]
+        except QueueFullError as e:
+            st.error(str(e))
+    if generate_all_col.button("Generate All Graphics"):
+        # One job per graphic type, sharing the warm engines and the bounded worker pool
+        try:
+            all_engines = [get_engine(m) for m in GENERATOR_SCRIPTS]
+        except Exception as e:
+            st.error(f"Error: Could not load every generator: {e}")
+            all_engines = []
+        job_ids = []
+        for e in all_engines:
+            try:
+                job_ids.append(runner.submit(e, workspace, workbook_for(e.mode)).id)
+            except QueueFullError as error:
+                st.error(f"{e.mode}: {error}")
+        if job_ids:
+            st.session_state["job_ids"] = job_ids
+
+    current_jobs = [job for job in (runner.get(job_id) for job_id in st.session_state.get("job_ids", [])) if job is not None]
+    if current_jobs and not all(job.finished for job in current_jobs):
+        show_job_progress(workspace, [job.id for job in current_jobs])
+    elif current_jobs:
+        show_run_results(current_jobs)
+
+
+workbook_downloads(workspace)
+workbook_uploads(workspace)
+results_editor(workspace)
+logo_coverage_panel(workspace)
+generation_panel(workspace)
@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import mmap
+import struct
+from PIL import Image
+from workspace import asset_version
+
+# --- Configuration Constants ---
+PACK_FILENAME = ".assets.pack"
+ATLAS_FILENAME = ".logo_atlas_{width}x{height}_{resample}.pack"
+PACK_MAGIC = b"FGPACK01"
+PACK_ALIGNMENT = 64
+PACKED_DIRS = ("Logos", "Templates")
+PACKED_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+PACKED_FONT_EXTENSIONS = (".ttf", ".otf")
+
+# Layout: magic, index length (little-endian uint64), JSON index, then one
+# aligned block per asset. Images are stored decoded as raw RGBA, fonts as-is.
+# A logo atlas has the same layout, holding every logo already resized to one size.
+_HEADER = struct.Struct("<8sQ")
+
+
+def pack_path(assets_dir: str) -> str:
+    return os.path.join(assets_dir, PACK_FILENAME)
+
+
+def atlas_path(assets_dir: str, size: tuple, resample: int = Image.Resampling.LANCZOS) -> str:
+    return os.path.join(assets_dir, ATLAS_FILENAME.format(width=size[0], height=size[1], resample=int(resample)))
+
+
+def _iter_packable_files(assets_dir: str):
+    """
+    Yields (relative_path, absolute_path) for the fonts, logos and templates in assets_dir.
+    """
+    for filename in sorted(os.listdir(assets_dir)):
+        abs_path = os.path.join(assets_dir, filename)
+        if os.path.isfile(abs_path) and filename.lower().endswith(PACKED_FONT_EXTENSIONS):
+            yield filename, abs_path
+    for folder in PACKED_DIRS:
+        for current_dir, dirnames, filenames in os.walk(os.path.join(assets_dir, folder)):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.lower().endswith(PACKED_IMAGE_EXTENSIONS):
+                    abs_path = os.path.join(current_dir, filename)
+                    yield os.path.relpath(abs_path, assets_dir), abs_path
+
+
+def _align(offset: int) -> int:
+    return (offset + PACK_ALIGNMENT - 1) // PACK_ALIGNMENT * PACK_ALIGNMENT
+
+
+# --- Build ---
+def _write_pack(path: str, assets_dir: str, items, **metadata) -> str:
+    """
+    Writes (relative_path, absolute_path, kind, data, extra entry fields) items as a pack at path.
+    """
+    blocks, entries = [], {}
+    offset = 0
+    for rel_path, abs_path, kind, data, extra in items:
+        entry = {"kind": kind, **extra, "offset": offset, "length": len(data), "mtime_ns": os.stat(abs_path).st_mtime_ns}
+        entries[rel_path.replace(os.sep, "/")] = entry
+        blocks.append((offset, data))
+        offset = _align(offset + len(data))
+
+    index = json.dumps({"version": asset_version(assets_dir), **metadata, "entries": entries}).encode("utf-8")
+    data_start = _align(_HEADER.size + len(index))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(PACK_MAGIC, len(index)))
+        f.write(index)
+        for block_offset, data in blocks:
+            f.seek(data_start + block_offset)
+            f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _decode_rgba(rel_path: str, abs_path: str) -> Image.Image:
+    try:
+        with Image.open(abs_path) as img:
+            return img.convert("RGBA")
+    except OSError as e:
+        print(f"Warning: Could not pack {rel_path}. {e}")
+        return None
+
+
+def _is_logo(rel_path: str) -> bool:
+    return rel_path.replace(os.sep, "/").startswith("Logos/")
+
+
+def build_asset_pack(assets_dir: str, include_logos: bool = True) -> str:
+    """
+    Decodes every logo and template in assets_dir once and writes them, with the
+    fonts, into a single indexed file next to them. Returns the pack's path.
+    Each entry records the source file's mtime, so an asset that changes after
+    the build is simply read from disk again. Without include_logos only
+    templates and fonts are packed, for when logo atlases serve every logo size
+    in use (full-size logos take up most of a pack's size).
+    """
+    def items():
+        for rel_path, abs_path in _iter_packable_files(assets_dir):
+            if not include_logos and _is_logo(rel_path):
+                continue
+            if rel_path.lower().endswith(PACKED_FONT_EXTENSIONS):
+                with open(abs_path, "rb") as f:
+                    yield rel_path, abs_path, "font", f.read(), {}
+            else:
+                rgba = _decode_rgba(rel_path, abs_path)
+                if rgba is not None:
+                    yield rel_path, abs_path, "image", rgba.tobytes(), {"size": list(rgba.size)}
+
+    return _write_pack(pack_path(assets_dir), assets_dir, items(), logos=include_logos)
+
+
+def build_logo_atlas(assets_dir: str, size: tuple, resample: int = Image.Resampling.LANCZOS) -> str:
+    """
+    Writes every logo in assets_dir, already resized to size with resample, into
+    one raw RGBA file with an index (a logo atlas). Returns the atlas's path.
+    """
+    size = tuple(size)
+
+    def items():
+        for rel_path, abs_path in _iter_packable_files(assets_dir):
+            if _is_logo(rel_path):
+                rgba = _decode_rgba(rel_path, abs_path)
+                if rgba is not None:
+                    yield rel_path, abs_path, "image", rgba.resize(size, resample).tobytes(), {"size": list(size)}
+
+    return _write_pack(atlas_path(assets_dir, size, resample), assets_dir, items(), size=list(size), resample=int(resample))
+
+
+# --- Runtime ---
+class AssetPack:
+    """
+    A built asset pack, memory-mapped read-only. Images are handed out as
+    zero-copy views of the map, so nothing is decoded or copied until used.
+    """
+
+    def __init__(self, assets_dir: str, path: str = None):
+        self.assets_dir = os.path.abspath(assets_dir)
+        self.path = path or pack_path(assets_dir)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = _HEADER.unpack_from(self._map, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{self.path} is not an asset pack")
+        index = json.loads(self._map[_HEADER.size:_HEADER.size + index_length])
+        self.version = index["version"]
+        self.entries = index["entries"]
+        self.metadata = {key: value for key, value in index.items() if key != "entries"}
+        self._data_start = _align(_HEADER.size + index_length)
+        self._view = memoryview(self._map)
+
+    def _entry(self, path: str, mtime_ns: int, kind: str):
+        rel_path = os.path.relpath(os.path.abspath(path), self.assets_dir).replace(os.sep, "/")
+        entry = self.entries.get(rel_path)
+        if entry is None or entry["kind"] != kind or entry["mtime_ns"] != mtime_ns:
+            return None
+        start = self._data_start + entry["offset"]
+        return entry, self._view[start:start + entry["length"]]
+
+    def image(self, path: str, mtime_ns: int) -> Image.Image:
+        """
+        Returns the packed RGBA image for path as a read-only view, or None if
+        the pack does not hold this version of the file.
+        """
+        found = self._entry(path, mtime_ns, "image")
+        if found is None:
+            return None
+        entry, data = found
+        return Image.frombuffer("RGBA", tuple(entry["size"]), data, "raw", "RGBA", 0, 1)
+
+    def data(self, path: str, mtime_ns: int) -> memoryview:
+        """
+        Returns the packed bytes of a font, or None if the pack does not hold this version of the file.
+        """
+        found = self._entry(path, mtime_ns, "font")
+        return None if found is None else found[1]
+
+
+def open_asset_pack(assets_dir: str, include_logos: bool = True) -> AssetPack:
+    """
+    Opens the pack for assets_dir, building it first if it is missing, was
+    built from a different set of synced assets or with(out) the logos.
+    """
+    try:
+        pack = AssetPack(assets_dir)
+        if pack.version == asset_version(assets_dir) and pack.metadata.get("logos", True) == include_logos:
+            return pack
+    except (OSError, ValueError, KeyError, struct.error):
+        pass
+    print(f"Building asset pack for {assets_dir}...")
+    build_asset_pack(assets_dir, include_logos)
+    return AssetPack(assets_dir)
+
+
+def open_logo_atlas(assets_dir: str, size: tuple, resample: int = Image.Resampling.LANCZOS) -> AssetPack:
+    """
+    Opens the logo atlas for size, building it first if it is missing or stale.
+    """
+    path = atlas_path(assets_dir, size, resample)
+    try:
+        atlas = AssetPack(assets_dir, path)
+        if atlas.version == asset_version(assets_dir):
+            return atlas
+    except (OSError, ValueError, KeyError, struct.error):
+        pass
+    print(f"Building {size[0]}x{size[1]} logo atlas for {assets_dir}...")
+    build_logo_atlas(assets_dir, size, resample)
+    return AssetPack(assets_dir, path)
+
+
+# --- Execution (build step) ---
+if __name__ == "__main__":
+    # python asset_pack.py [assets_dir] [WxH ...] builds the pack and a logo atlas per size;
+    # with atlases the pack itself leaves the full-size logos out
+    target_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmp", "project")
+    print(f"Wrote {build_asset_pack(target_dir, include_logos=len(sys.argv) <= 2)}")
+    for size_arg in sys.argv[2:]:
+        width, height = (int(value) for value in size_arg.lower().split("x"))
+        print(f"Wrote {build_logo_atlas(target_dir, (width, height))}")
@@ -0,0 +1,192 @@
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from PIL import Image, ImageFont
+
+# --- Configuration Constants ---
+LOGO_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Every logo at every size in use fits several times over
+
+# --- Warm Asset Caches ---
+# Shared by all generator scripts so that fonts, templates and logos are
+# decoded once per process instead of once per graphic.
+
+# Set by use_asset_pack(); when it holds a file, the file is not opened or decoded
+_asset_pack = None
+# Set by use_logo_disk_cache(); resized logos are kept there across processes
+_logo_disk_cache_dir = None
+# Set by use_logo_atlas(); (size, resample) -> atlas of logos already at that size
+_logo_atlases = {}
+_SOURCE_DIGESTS = {}
+
+
+def use_asset_pack(pack):
+    """
+    Serves fonts, templates and logos held in pack (an asset_pack.AssetPack)
+    from its memory map. Files the pack does not hold, or holds an older
+    version of, are still read from disk. Pass None to read everything from disk.
+    """
+    global _asset_pack
+    _asset_pack = pack
+
+
+def use_logo_atlas(atlas):
+    """
+    Serves logos at the atlas's size (an asset_pack.AssetPack built by
+    build_logo_atlas) as zero-copy views of its memory map, ahead of every
+    other cache. Each process maps the same file, so the pages are shared.
+    """
+    _logo_atlases[(tuple(atlas.metadata["size"]), atlas.metadata["resample"])] = atlas
+
+
+def use_logo_disk_cache(cache_dir: str):
+    """
+    Keeps every logo resized by load_logo() as a small PNG in cache_dir, so a
+    cold process loads the ready-sized file instead of decoding and resampling
+    the full-size original. When an edited logo is resized again, the entries
+    made from its earlier versions are deleted. Pass None to stop.
+    """
+    global _logo_disk_cache_dir
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    _logo_disk_cache_dir = cache_dir
+
+
+def _source_digest(path: str, stat: os.stat_result) -> str:
+    # Hashed once per file version; a touched but unchanged logo keeps its cached sizes
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    digest = _SOURCE_DIGESTS.get(key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        _SOURCE_DIGESTS[key] = digest
+    return digest
+
+
+def _resize_logo(logo_path: str, stat: os.stat_result, size: tuple, resample: int) -> Image.Image:
+    cache_dir = _logo_disk_cache_dir
+    if cache_dir is None:
+        return _open_rgba(logo_path, stat.st_mtime_ns).resize(size, resample)
+    # One entry per logo and size; the source digest names the version it was made from
+    prefix = f"{hashlib.sha1(os.path.abspath(logo_path).encode()).hexdigest()[:16]}_{size[0]}x{size[1]}_{int(resample)}_"
+    cached_name = f"{prefix}{_source_digest(logo_path, stat)}.png"
+    cached_path = os.path.join(cache_dir, cached_name)
+    try:
+        with Image.open(cached_path) as cached:
+            return cached.convert("RGBA")
+    except (OSError, ValueError):
+        pass
+    logo = _open_rgba(logo_path, stat.st_mtime_ns).resize(size, resample)
+    tmp_path = f"{cached_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        logo.save(tmp_path, format="PNG")
+        os.replace(tmp_path, cached_path)
+    except OSError as e:
+        print(f"Warning: Could not cache resized logo {os.path.basename(logo_path)}. {e}")
+        return logo
+    _remove_stale_resized_logos(cache_dir, prefix, cached_name)
+    return logo
+
+
+def _remove_stale_resized_logos(cache_dir: str, prefix: str, current_name: str):
+    """
+    Deletes the cached versions of a logo at one size made from earlier edits of the file.
+    """
+    try:
+        stale = [entry.path for entry in os.scandir(cache_dir) if entry.name.startswith(prefix) and entry.name.endswith(".png") and entry.name != current_name]
+    except OSError:
+        return
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            # Another process removed it first, or it is still being read; the next miss retries
+            pass
+
+
+def _open_rgba(path: str, mtime_ns: int) -> Image.Image:
+    pack = _asset_pack
+    image = pack.image(path, mtime_ns) if pack is not None else None
+    return image if image is not None else Image.open(path).convert("RGBA")
+
+
+@lru_cache(maxsize=64)
+def load_font(font_path: str, size: int) -> ImageFont.FreeTypeFont:
+    """
+    Returns a cached FreeType font for the given path and point size.
+    Raises the same errors as ImageFont.truetype if the font cannot be loaded.
+    """
+    pack = _asset_pack
+    if pack is not None and os.path.exists(font_path):
+        data = pack.data(font_path, os.stat(font_path).st_mtime_ns)
+        if data is not None:
+            return ImageFont.truetype(io.BytesIO(data), size)
+    return ImageFont.truetype(font_path, size)
+
+
+@lru_cache(maxsize=32)
+def _load_template_cached(template_path: str, mtime_ns: int) -> Image.Image:
+    return _open_rgba(template_path, mtime_ns)
+
+
+def load_template(template_path: str) -> Image.Image:
+    """
+    Returns the decoded RGBA template image, cached until the file changes.
+    The returned image is shared: callers must .copy() it before drawing.
+    """
+    return _load_template_cached(template_path, os.stat(template_path).st_mtime_ns)
+
+
+# Resized logos, least recently used first, evicted by total pixel bytes
+_LOGO_CACHE = OrderedDict()
+_LOGO_CACHE_LOCK = threading.Lock()
+_logo_cache_bytes = 0
+_logo_cache_hits = 0
+_logo_cache_misses = 0
+
+
+def load_logo(logo_path: str, size: tuple, resample: int = Image.Resampling.LANCZOS) -> Image.Image:
+    """
+    Returns the logo at logo_path as an RGBA image resized to size, cached until the file changes.
+    The returned image is shared: callers may paste from it but must not draw on it.
+    """
+    global _logo_cache_bytes, _logo_cache_hits, _logo_cache_misses
+    stat = os.stat(logo_path)
+    key = (logo_path, stat.st_mtime_ns, tuple(size), resample)
+    atlas = _logo_atlases.get((key[2], int(resample)))
+    if atlas is not None:
+        logo = atlas.image(logo_path, stat.st_mtime_ns)
+        if logo is not None:
+            return logo
+    with _LOGO_CACHE_LOCK:
+        logo = _LOGO_CACHE.get(key)
+        if logo is not None:
+            _LOGO_CACHE.move_to_end(key)
+            _logo_cache_hits += 1
+            return logo
+        _logo_cache_misses += 1
+    logo = _resize_logo(logo_path, stat, key[2], resample)
+    with _LOGO_CACHE_LOCK:
+        if key not in _LOGO_CACHE:
+            _LOGO_CACHE[key] = logo
+            _logo_cache_bytes += len(logo.getbands()) * logo.width * logo.height
+        while _logo_cache_bytes > LOGO_CACHE_MAX_BYTES and len(_LOGO_CACHE) > 1:
+            _, evicted = _LOGO_CACHE.popitem(last=False)
+            _logo_cache_bytes -= len(evicted.getbands()) * evicted.width * evicted.height
+    return logo
+
+
+def logo_cache_info() -> dict:
+    """
+    Hit/miss counts and current size of the resized logo cache.
+    """
+    with _LOGO_CACHE_LOCK:
+        return {
+            "hits": _logo_cache_hits,
+            "misses": _logo_cache_misses,
+            "entries": len(_LOGO_CACHE),
+            "bytes": _logo_cache_bytes,
+            "max_bytes": LOGO_CACHE_MAX_BYTES,
+        }
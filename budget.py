@@ -0,0 +1,111 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# --- Configuration Constants ---
+DEFAULT_JOB_TIMEOUT_SECONDS = float(os.environ.get("GRAPHICS_JOB_TIMEOUT_SECONDS", "120"))
+# Growth of the process's memory allowed while a job runs; a render needs well under 100 MB
+DEFAULT_JOB_MAX_MEMORY_MB = float(os.environ.get("GRAPHICS_JOB_MAX_MEMORY_MB", "512"))
+MEMORY_CHECK_INTERVAL_SECONDS = 0.25  # Reading the process size on every checkpoint is wasteful
+
+
+class JobCancelled(BaseException):
+    """
+    Raised at a checkpoint when a job is cancelled or exceeds its budget.
+    A BaseException (like KeyboardInterrupt) so the generators' broad
+    "except Exception" fallbacks do not swallow it.
+    """
+
+
+def process_memory_bytes() -> int:
+    """
+    Current resident size of this process, or 0 where it cannot be read.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+# --- Budget ---
+class JobBudget:
+    """
+    Limits for one generation job: a cancel flag set from the page, a wall-clock
+    deadline and a ceiling on how much the process's memory may grow while the
+    job runs. Renders run as threads, which cannot be killed, so the limits are
+    enforced cooperatively at checkpoint().
+
+    Threads share one process, so the growth is measured against the resident
+    size when the job started rather than against a fixed total: memory already
+    held by the app's caches or by jobs that were running beforehand is not
+    charged to it. Growth from jobs running alongside it still counts, so the
+    limit guards against runaway renders rather than accounting exactly.
+    """
+
+    def __init__(self, timeout_seconds: float = DEFAULT_JOB_TIMEOUT_SECONDS, max_memory_mb: float = DEFAULT_JOB_MAX_MEMORY_MB):
+        self.timeout_seconds = timeout_seconds
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024) if max_memory_mb else 0
+        self.deadline = None
+        self.baseline_bytes = 0
+        self._cancelled = threading.Event()
+        self._next_memory_check = 0.0
+
+    def start(self):
+        """
+        Starts the wall clock and records the memory baseline; called when the job leaves the queue.
+        """
+        if self.max_memory_bytes:
+            self.baseline_bytes = process_memory_bytes()
+        if self.timeout_seconds:
+            self.deadline = time.monotonic() + self.timeout_seconds
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self):
+        """
+        Raises JobCancelled if the job was cancelled or is over budget.
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled("Cancelled from the page.")
+        now = time.monotonic()
+        if self.deadline is not None and now > self.deadline:
+            raise JobCancelled(f"Stopped after exceeding the {self.timeout_seconds:g}s time limit.")
+        if self.max_memory_bytes and now >= self._next_memory_check:
+            self._next_memory_check = now + MEMORY_CHECK_INTERVAL_SECONDS
+            grown = process_memory_bytes() - self.baseline_bytes
+            if grown > self.max_memory_bytes:
+                raise JobCancelled(f"Stopped after exceeding the memory limit ({grown / 1024 / 1024:.0f} MB used since the job started, {self.max_memory_bytes / 1024 / 1024:.0f} MB allowed).")
+
+
+_local = threading.local()
+
+
+@contextmanager
+def enforce_budget(budget: JobBudget):
+    """
+    Makes budget the one checked by checkpoint() on the current thread for the duration of the block.
+    """
+    previous = getattr(_local, "budget", None)
+    _local.budget = budget
+    try:
+        yield budget
+    finally:
+        _local.budget = previous
+
+
+def checkpoint():
+    """
+    Called by the generators inside their pagination and drawing loops.
+    Raises JobCancelled if the current thread's job should stop; does nothing
+    outside a job (e.g. the live preview or running a script locally).
+    """
+    budget = getattr(_local, "budget", None)
+    if budget is not None:
+        budget.check()
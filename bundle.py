@@ -0,0 +1,44 @@
+import io
+import os
+import zipfile
+import threading
+from collections import OrderedDict
+
+# --- Configuration Constants ---
+BUNDLE_FOLDER_NAME = "Graphics"
+MAX_CACHED_BUNDLES = 8
+
+_BUNDLE_CACHE = OrderedDict()
+_BUNDLE_CACHE_LOCK = threading.Lock()
+
+
+def build_zip_bundle(paths: list[str], folder_name: str = BUNDLE_FOLDER_NAME) -> bytes:
+    """
+    Packs the given PNGs into an in-memory ZIP.
+    PNGs are already compressed, so entries are stored rather than deflated.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zipf:
+        for path in paths:
+            zipf.write(path, os.path.join(folder_name, os.path.basename(path)))
+    return buffer.getvalue()
+
+
+def get_zip_bundle(outputs: list[tuple[str, str]]) -> bytes:
+    """
+    Returns the ZIP for a run's outputs, given as (path, content hash) pairs.
+    The bundle is built once per distinct set of outputs and then served from memory.
+    """
+    key = tuple((os.path.basename(path), digest) for path, digest in outputs)
+    with _BUNDLE_CACHE_LOCK:
+        if key in _BUNDLE_CACHE:
+            _BUNDLE_CACHE.move_to_end(key)
+            return _BUNDLE_CACHE[key]
+
+    data = build_zip_bundle([path for path, _ in outputs])
+
+    with _BUNDLE_CACHE_LOCK:
+        _BUNDLE_CACHE[key] = data
+        while len(_BUNDLE_CACHE) > MAX_CACHED_BUNDLES:
+            _BUNDLE_CACHE.popitem(last=False)
+    return data
@@ -0,0 +1,322 @@
+import os
+import io
+import sys
+import time
+import threading
+import traceback
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import ModuleType
+from workspace import SessionWorkspace, asset_version, file_digest
+from workbooks import WorkbookError, load_workbook_file, model_digest
+from budget import JobBudget, JobCancelled, enforce_budget
+from logo_coverage import check_logo_coverage
+from logo_index import get_logo_index
+from assets import load_logo
+
+# --- Configuration Constants ---
+GENERATOR_SCRIPTS = {
+    "Fixtures": "Fixtures - automated.py",
+    "Match of the Day": "match of the day - automated.py",
+    "Results": "Results - automated.py",
+    "Table": "table - automated.py",
+}
+# Module setting that names each generator's input workbook
+GENERATOR_WORKBOOK_SETTINGS = {
+    "Fixtures": "FIXTURES_FILE_PATH",
+    "Match of the Day": "MATCH_DATA_EXCEL_PATH",
+    "Results": "RESULTS_FILE_PATH",
+    "Table": "LEAGUE_TABLE_FILE_PATH",
+}
+# Each generator's entry point, and whether it takes one template file ("template_path")
+# or the whole templates folder ("templates_folder"). Every entry point also takes
+# workbook: the already parsed model for its file, so the Excel file is not read again.
+GENERATOR_ENTRY_POINTS = {
+    "Fixtures": ("generate_fixtures_graphics", "template_path"),
+    "Match of the Day": ("generate_match_of_the_day_graphics", "templates_folder"),
+    "Results": ("generate_results_graphics", "template_path"),
+    "Table": ("generate_league_table_graphics", "templates_folder"),
+}
+LOGO_WARMUP_WORKERS = 4
+# Module settings giving each generator's logo (width, height); a single setting holds the whole size
+GENERATOR_LOGO_SIZE_SETTINGS = {
+    "Fixtures": ("LOGO_WIDTH", "LOGO_HEIGHT"),
+    "Match of the Day": ("LOGO_DISPLAY_SIZE",),
+    "Results": ("LOGO_WIDTH", "LOGO_HEIGHT"),
+    "Table": ("LOGO_SIZE", "LOGO_SIZE"),
+}
+
+
+# --- Per-Thread Console Capture ---
+class _ThreadRoutedStream:
+    """
+    sys.stdout/sys.stderr replacement that sends writes from a capturing thread to
+    that thread's buffer and everything else to the real stream. Unlike
+    contextlib.redirect_stdout this is safe when several sessions generate at once.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def write(self, text: str) -> int:
+        target = getattr(self._local, "target", None) or self._fallback
+        return target.write(text)
+
+    def flush(self):
+        target = getattr(self._local, "target", None) or self._fallback
+        target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
+
+_STDOUT_INSTALL_LOCK = threading.Lock()
+
+
+@contextmanager
+def capture_thread_output(buffer, include_stderr: bool = False):
+    """
+    Routes print() output from the current thread into buffer for the duration of the block.
+    With include_stderr, warnings and tracebacks written to stderr go to the same buffer.
+    """
+    with _STDOUT_INSTALL_LOCK:
+        if not isinstance(sys.stdout, _ThreadRoutedStream):
+            sys.stdout = _ThreadRoutedStream(sys.stdout)
+        if not isinstance(sys.stderr, _ThreadRoutedStream):
+            sys.stderr = _ThreadRoutedStream(sys.stderr)
+        routers = [sys.stdout, sys.stderr] if include_stderr else [sys.stdout]
+    previous = [getattr(router._local, "target", None) for router in routers]
+    for router in routers:
+        router._local.target = buffer
+    try:
+        yield buffer
+    finally:
+        for router, target in zip(routers, previous):
+            router._local.target = target
+
+
+class LineStream(io.StringIO):
+    """
+    StringIO that also hands every completed line to line_callback as it is
+    written, so console output can be shown while a generator is still running.
+    """
+
+    def __init__(self, line_callback=None):
+        super().__init__()
+        self._line_callback = line_callback
+        self._partial = ""
+
+    def write(self, text: str) -> int:
+        written = super().write(text)
+        if self._line_callback:
+            *lines, self._partial = (self._partial + text).split("\n")
+            for line in lines:
+                self._line_callback(line)
+        return written
+
+    def flush_partial(self):
+        """
+        Sends any final line that did not end with a newline.
+        """
+        if self._line_callback and self._partial:
+            self._line_callback(self._partial)
+        self._partial = ""
+
+
+# --- Helper Functions ---
+def load_generator_module(script_path: str) -> ModuleType:
+    """
+    Imports a generator script by file path (the script names contain spaces,
+    so they cannot be imported with a normal import statement).
+    """
+    base_name = os.path.splitext(os.path.basename(script_path))[0]
+    module_name = "generator_" + "".join(c if c.isalnum() else "_" for c in base_name.lower())
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _remove_partial_outputs(paths: list[str]):
+    """
+    Deletes the graphics a stopped run saved, so a half-finished set is never shown or kept.
+    """
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Warning: Could not remove partial output {path}. {e}")
+
+
+def _report_logo_coverage(logos_folder: str, workbook):
+    """
+    Prints which teams in the run's workbook will get no logo or an uncertain one.
+    Returns the coverage report.
+    """
+    coverage = check_logo_coverage(logos_folder, workbook)
+    print(f"Logo check: {coverage.summary()}")
+    for match in coverage.missing:
+        print(f"Warning: No logo found for '{match.team_name}'; the generic logo will be used.")
+    for match in coverage.ambiguous:
+        others = ", ".join(os.path.basename(path) for path in match.alternatives)
+        print(f"Warning: '{match.team_name}' could be {others}; the generic logo will be used.")
+    return coverage
+
+
+# Shared by all runs, so concurrent jobs do not multiply the decoding threads
+_LOGO_WARMUP_POOL = ThreadPoolExecutor(max_workers=LOGO_WARMUP_WORKERS, thread_name_prefix="logo-warmup")
+
+
+def _warm_logo(path: str, size: tuple) -> bool:
+    try:
+        load_logo(path, size)
+        return True
+    except Exception:
+        # The generator reports the failure when it draws this logo
+        return False
+
+
+def _warm_logos(logos_folder: str, coverage, size: tuple) -> int:
+    """
+    Decodes and resizes every logo the run will draw, concurrently (Pillow releases
+    the GIL while decoding and resampling), so drawing rows only hits warm caches.
+    Returns the number of logos warmed.
+    """
+    paths = {match.path for match in coverage.matches if match.path}
+    paths.add(get_logo_index(logos_folder).generic_path)
+    return sum(_LOGO_WARMUP_POOL.map(_warm_logo, paths, [size] * len(paths)))
+
+
+def _load_workbook(path: str):
+    """
+    Returns the cached parsed model for a workbook, or None (so the generator
+    reads the file itself, as it always has) if the workbook does not validate.
+    """
+    try:
+        workbook = load_workbook_file(path)
+    except (WorkbookError, OSError) as e:
+        print(f"Warning: Could not use parsed workbook {os.path.basename(path)}: {e}")
+        return None
+    for warning in workbook.warnings:
+        print(f"Warning: {warning}")
+    return workbook
+
+
+# --- Engine ---
+class GeneratorEngine:
+    """
+    Holds one imported generator module so that its imports, fonts, templates
+    and logos stay warm between runs in the same process.
+    """
+
+    def __init__(self, mode: str, repo_root: str):
+        if mode not in GENERATOR_SCRIPTS:
+            raise ValueError(f"Unknown graphic type: {mode}")
+        self.mode = mode
+        self.script_path = os.path.join(repo_root, GENERATOR_SCRIPTS[mode])
+        self.module = load_generator_module(self.script_path)
+
+    def workbook_path(self, workspace: SessionWorkspace) -> str:
+        """
+        The workbook this generator reads in the given workspace.
+        """
+        return workspace.workbook(os.path.basename(getattr(self.module, GENERATOR_WORKBOOK_SETTINGS[self.mode])))
+
+    @property
+    def logo_size(self) -> tuple:
+        """
+        The (width, height) this generator draws team logos at.
+        """
+        values = [getattr(self.module, name) for name in GENERATOR_LOGO_SIZE_SETTINGS[self.mode]]
+        return tuple(values[0]) if len(values) == 1 else tuple(values)
+
+    def job_key(self, workspace: SessionWorkspace, workbook=None) -> tuple:
+        """
+        Identifies a run by its inputs: (graphic type, workbook content hash, asset version).
+        Two runs with the same key produce the same graphics.
+        """
+        if workbook is None:
+            path = self.workbook_path(workspace)
+            try:
+                input_digest = model_digest(load_workbook_file(path))
+            except (WorkbookError, OSError):
+                # Falls back to the raw bytes for workbooks that do not parse
+                input_digest = file_digest(path) if os.path.exists(path) else None
+        else:
+            input_digest = model_digest(workbook)
+        return (self.mode, input_digest, asset_version(workspace.assets_dir))
+
+    def _generate(self, workspace: SessionWorkspace, progress_callback=None, workbook=None) -> list[str]:
+        """
+        Calls the generator's entry point on the session workspace. workbook is the
+        parsed model, or None to let the generator read its file itself.
+        """
+        function_name, template_argument = GENERATOR_ENTRY_POINTS[self.mode]
+        if template_argument == "template_path":
+            template = os.path.join(workspace.templates_dir, os.path.basename(self.module.TEMPLATE_PATH))
+        else:
+            template = workspace.templates_dir
+        return getattr(self.module, function_name)(
+            self.workbook_path(workspace),
+            workspace.logos_dir,
+            workspace.graphics_dir,
+            font_path=workspace.asset(os.path.basename(self.module.FONT_PATH)),
+            progress_callback=progress_callback,
+            workbook=workbook,
+            **{template_argument: template},
+        )
+
+    def run(self, workspace: SessionWorkspace, progress_callback=None, workbook=None, line_callback=None, budget: JobBudget = None, setup_callback=None) -> dict:
+        """
+        Runs the generator against the session workspace. Safe to call from
+        several threads at once; each call captures only its own console output.
+        progress_callback, if given, is called as (part_number, total_parts, path)
+        as soon as each graphic is saved.
+        workbook, if given, is a parsed model (see workbooks.py) used instead of
+        the session's workbook file, e.g. scores edited in the browser.
+        line_callback, if given, receives each line of console output (stdout and
+        stderr) as soon as it is printed.
+        budget, if given, is checked at the generators' checkpoints; if the run is
+        cancelled or goes over budget, the graphics it already saved are deleted.
+        setup_callback, if given, is called with the seconds spent loading the
+        workbook and warming logos, just before the generator starts rendering.
+        Returns a dict with 'paths' (saved graphics), 'stdout', 'error' (traceback or None),
+        'cancelled' (the reason a stopped run was stopped, or None) and 'seconds' (wall time).
+        """
+        output = LineStream(line_callback)
+        paths, error, cancelled = [], None, None
+        saved_paths = []
+
+        def on_part_saved(part_number: int, total_parts: int, path: str):
+            saved_paths.append(path)
+            if progress_callback:
+                progress_callback(part_number, total_parts, path)
+
+        start = time.perf_counter()
+        with capture_thread_output(output, include_stderr=True), enforce_budget(budget):
+            try:
+                if workbook is None:
+                    workbook = _load_workbook(self.workbook_path(workspace))
+                if workbook is not None:
+                    # Preflight: cached per workbook, so this is one hash on repeat runs
+                    coverage = _report_logo_coverage(workspace.logos_dir, workbook)
+                    _warm_logos(workspace.logos_dir, coverage, self.logo_size)
+                if setup_callback:
+                    setup_callback(time.perf_counter() - start)
+                paths = self._generate(workspace, on_part_saved, workbook) or []
+            except JobCancelled as e:
+                cancelled = str(e)
+                print(f"{self.mode} stopped: {cancelled}")
+                _remove_partial_outputs(saved_paths)
+            except Exception:
+                error = traceback.format_exc()
+        output.flush_partial()
+        return {
+            "paths": paths,
+            "stdout": output.getvalue(),
+            "error": error,
+            "cancelled": cancelled,
+            "seconds": time.perf_counter() - start,
+        }
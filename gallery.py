@@ -0,0 +1,46 @@
+import io
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+# --- Configuration Constants ---
+THUMBNAIL_MAX_SIZE = (270, 338)  # A quarter of the 1080x1350 graphics
+THUMBNAIL_JPEG_QUALITY = 85
+MAX_CACHED_THUMBNAILS = 256
+
+_THUMBNAIL_CACHE = OrderedDict()
+_THUMBNAIL_CACHE_LOCK = threading.Lock()
+
+
+def make_thumbnail(path: str, max_size: tuple = THUMBNAIL_MAX_SIZE) -> bytes:
+    """
+    Returns a small JPEG preview of the graphic at path.
+    Transparent areas are flattened onto white.
+    """
+    with Image.open(path) as img:
+        img.draft("RGB", max_size)
+        img = img.convert("RGBA")
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    flattened = Image.new("RGB", img.size, (255, 255, 255))
+    flattened.paste(img, (0, 0), img)
+    buffer = io.BytesIO()
+    flattened.save(buffer, format="JPEG", quality=THUMBNAIL_JPEG_QUALITY)
+    return buffer.getvalue()
+
+
+def get_thumbnail(path: str, digest: str) -> bytes:
+    """
+    Returns the thumbnail for an output, generated once per content hash and then served from memory.
+    """
+    with _THUMBNAIL_CACHE_LOCK:
+        if digest in _THUMBNAIL_CACHE:
+            _THUMBNAIL_CACHE.move_to_end(digest)
+            return _THUMBNAIL_CACHE[digest]
+
+    data = make_thumbnail(path)
+
+    with _THUMBNAIL_CACHE_LOCK:
+        _THUMBNAIL_CACHE[digest] = data
+        while len(_THUMBNAIL_CACHE) > MAX_CACHED_THUMBNAILS:
+            _THUMBNAIL_CACHE.popitem(last=False)
+    return data
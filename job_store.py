@@ -0,0 +1,99 @@
+import json
+import sqlite3
+import threading
+import time
+
+# --- Configuration Constants ---
+ACTIVE_STATUSES = ("queued", "running")
+INTERRUPTED_ERROR = "Interrupted: the server restarted before this job finished."
+HISTORY_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    job_key TEXT,
+    status TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_submitted ON jobs (status, submitted_at);
+"""
+
+
+class JobStore:
+    """
+    The job table, kept in a local SQLite file so the queue and its history
+    survive a server restart. Safe to use from several threads.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def recover(self) -> int:
+        """
+        Marks jobs left queued or running by a previous process as failed.
+        Their workbooks and callbacks lived in that process's memory, so they
+        cannot be resumed. Returns the number of jobs marked.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE status IN (?, ?)",
+                (time.time(), INTERRUPTED_ERROR, *ACTIVE_STATUSES),
+            )
+            return cursor.rowcount
+
+    def prune(self, max_age_seconds: float = HISTORY_MAX_AGE_SECONDS) -> int:
+        """
+        Deletes finished jobs older than max_age_seconds. Returns the number deleted.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status NOT IN (?, ?) AND submitted_at < ?",
+                (*ACTIVE_STATUSES, time.time() - max_age_seconds),
+            )
+            return cursor.rowcount
+
+    def add(self, job_id: str, mode: str, key: tuple, submitted_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, mode, job_key, status, submitted_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, mode, json.dumps(key), submitted_at),
+            )
+
+    def set_status(self, job_id: str, status: str, started_at: float = None, finished_at: float = None, error: str = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = COALESCE(?, started_at), "
+                "finished_at = COALESCE(?, finished_at), error = COALESCE(?, error) WHERE id = ?",
+                (status, started_at, finished_at, error, job_id),
+            )
+
+    def active_count(self) -> int:
+        """
+        Number of jobs queued or running.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", ACTIVE_STATUSES
+            ).fetchone()[0]
+
+    def queue_position(self, job_id: str) -> int:
+        """
+        1 for the next job to start, 2 for the one after, ...; 0 if the job is not waiting.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT submitted_at FROM jobs WHERE id = ? AND status = 'queued'", (job_id,)
+            ).fetchone()
+            if row is None:
+                return 0
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND submitted_at <= ?", (row[0],)
+            ).fetchone()[0]
@@ -0,0 +1,311 @@
+import os
+import time
+import uuid
+import traceback
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from engine import GeneratorEngine
+from workspace import SessionWorkspace, file_digest
+from manifest import build_manifest, write_manifest, prune_outputs
+from job_store import JobStore
+from budget import JobBudget
+
+# --- Configuration Constants ---
+# One worker per graphic type, so "Generate All" runs its four jobs side by side. Each
+# render holds several 1080x1350 RGBA images (tens of MB), so small instances can lower
+# this through the environment at the cost of Generate All taking longer.
+DEFAULT_MAX_WORKERS = int(os.environ.get("GRAPHICS_MAX_WORKERS", "4"))
+DEFAULT_MAX_QUEUED_JOBS = int(os.environ.get("GRAPHICS_MAX_QUEUED_JOBS", "8"))
+MAX_RETAINED_JOBS = 100
+MAX_LOG_LINES = 2000
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+
+
+class QueueFullError(RuntimeError):
+    """
+    Raised by JobRunner.submit when every worker is busy and the waiting queue is full.
+    """
+
+
+# --- Job ---
+class Job:
+    """
+    One generation request. Workers append progress events and saved paths as
+    they happen; the UI reads them through snapshot() while the job is running.
+    """
+
+    def __init__(self, mode: str, key: tuple = None, session: str = None):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.key = key
+        # Sessions waiting on this job; identical requests from several sessions share it
+        self.sessions = {session}
+        self.status = "queued"
+        self.events = []
+        self.log = []
+        self.paths = []
+        self.hashes = {}
+        self.stdout = ""
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.total_parts = None
+        self.render_seconds = {}
+        self.setup_seconds = None
+        self.manifest = None
+        self.budget = JobBudget()
+        self._last_saved_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def reusable(self) -> bool:
+        """
+        True while the job is in flight (and not being cancelled), or once it has
+        succeeded and its outputs still exist.
+        """
+        if self.budget.cancelled:
+            return False
+        if not self.finished:
+            return True
+        with self._lock:
+            return self.status == "done" and bool(self.paths) and all(os.path.exists(path) for path in self.paths)
+
+    def add_event(self, message: str, path: str = None):
+        with self._lock:
+            self.events.append({"time": time.time(), "message": message, "path": path})
+
+    def on_output_line(self, line: str):
+        """
+        line_callback for the engine: keeps each console line with the time it was printed.
+        """
+        with self._lock:
+            self.log.append({"time": time.time(), "line": line})
+            if len(self.log) > MAX_LOG_LINES:
+                del self.log[:len(self.log) - MAX_LOG_LINES]
+
+    def on_setup_done(self, seconds: float):
+        """
+        setup_callback for the engine: part 1's render time is measured from here, not from the job's start.
+        """
+        with self._lock:
+            self.setup_seconds = seconds
+            self._last_saved_at = time.time()
+
+    def on_part_saved(self, part_number: int, total_parts: int, path: str):
+        """
+        progress_callback for the generators: records each part the moment it is saved.
+        """
+        digest = file_digest(path)
+        now = time.time()
+        with self._lock:
+            self.total_parts = total_parts
+            self.paths.append(path)
+            self.hashes[path] = digest
+            self.render_seconds[path] = now - (self._last_saved_at or self.started_at or now)
+            self._last_saved_at = now
+        self.add_event(f"{self.mode} Part {part_number} of {total_parts} rendered", path)
+
+    def snapshot(self) -> dict:
+        """
+        Returns a consistent copy of the job's state for display.
+        """
+        with self._lock:
+            return {
+                "id": self.id,
+                "mode": self.mode,
+                "status": self.status,
+                "events": list(self.events),
+                "log": list(self.log),
+                "paths": list(self.paths),
+                "outputs": [(path, self.hashes.get(path)) for path in self.paths],
+                "total_parts": self.total_parts,
+                "stdout": self.stdout,
+                "error": self.error,
+                "submitted_at": self.submitted_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "manifest": self.manifest,
+            }
+
+    def build_manifest(self, status: str) -> dict:
+        """
+        Lists exactly the files this job produced, with sizes and per-part render times.
+        """
+        with self._lock:
+            files = [
+                {
+                    "path": path,
+                    "part": part_number,
+                    "size": os.path.getsize(path),
+                    "sha1": self.hashes.get(path),
+                    "render_seconds": self.render_seconds.get(path),
+                }
+                for part_number, path in enumerate(self.paths, start=1)
+                if os.path.exists(path)
+            ]
+            return build_manifest(self.id, self.mode, self.started_at, self.finished_at, status, files, self.setup_seconds)
+
+
+# --- Runner ---
+class JobRunner:
+    """
+    Runs generator engines on a bounded background thread pool so the page never
+    blocks waiting for a render. At most max_workers jobs render at once and at
+    most max_queued more wait; beyond that submit() rejects new work. Every job
+    is recorded in a SQLite job table at db_path.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_queued: int = DEFAULT_MAX_QUEUED_JOBS, db_path: str = ":memory:"):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._store = JobStore(db_path)
+        interrupted = self._store.recover()
+        if interrupted:
+            print(f"Marked {interrupted} job(s) from a previous run as interrupted.")
+        self._store.prune()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="graphics-job")
+        self._jobs = {}
+        self._jobs_by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, engine: GeneratorEngine, workspace: SessionWorkspace, workbook=None) -> Job:
+        """
+        Queues a run, or returns the existing job for identical inputs (same graphic
+        type, workbook content and assets) if it is still running or its outputs
+        are still on disk, so repeat clicks from any session never render twice.
+        The workspace's session is attached to the job it gets back.
+        Raises QueueFullError if the queue has no room.
+        """
+        key = engine.job_key(workspace, workbook)
+        with self._lock:
+            existing = self._jobs_by_key.get(key)
+            if existing is not None and existing.reusable:
+                with existing._lock:
+                    existing.sessions.add(workspace.root)
+                existing.add_event(f"{engine.mode} requested again with identical inputs; reusing this run")
+                return existing
+            if self._store.active_count() >= self.max_workers + self.max_queued:
+                raise QueueFullError(f"The render queue is full ({self.max_queued} waiting). Please try again shortly.")
+            job = Job(engine.mode, key, workspace.root)
+            self._store.add(job.id, job.mode, key, job.submitted_at)
+            self._jobs[job.id] = job
+            self._jobs_by_key[key] = job
+            self._forget_old_jobs()
+        job.add_event(f"{engine.mode} queued")
+        self._executor.submit(self._run, job, engine, workspace, workbook)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str, workspace: SessionWorkspace) -> bool:
+        """
+        Detaches the workspace's session from a job. The job itself is only asked
+        to stop once no session is waiting on it: a waiting job is then finished
+        at once and frees its queue slot; a running one stops at the generator's
+        next checkpoint and its partial outputs are deleted. Returns False if the
+        job is unknown, already finished or not attached to this session.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return False
+        with job._lock:
+            if job.finished or workspace.root not in job.sessions:
+                return False
+            job.sessions.discard(workspace.root)
+            if job.sessions:
+                stop = None
+            else:
+                job.budget.cancel()
+                stop = "queued" if job.status == "queued" else "running"
+                if stop == "queued":
+                    job.error = "Cancelled from the page."
+                    job.finished_at = time.time()
+                    job.status = "cancelled"
+        if stop is None:
+            job.add_event(f"{job.mode} left by one session; still running for the others")
+        elif stop == "queued":
+            job.add_event(f"{job.mode} cancelled before it started")
+            self._store.set_status(job.id, "cancelled", finished_at=job.finished_at, error=job.error)
+        else:
+            job.add_event(f"{job.mode} cancellation requested")
+        return True
+
+    def queue_position(self, job_id: str) -> int:
+        """
+        The job's place in the waiting queue (1 = next to start), or 0 once it has started.
+        """
+        return self._store.queue_position(job_id)
+
+    def _forget_old_jobs(self):
+        finished = [j for j in self._jobs.values() if j.finished]
+        for old_job in sorted(finished, key=lambda j: j.submitted_at)[:max(0, len(self._jobs) - MAX_RETAINED_JOBS)]:
+            del self._jobs[old_job.id]
+            if self._jobs_by_key.get(old_job.key) is old_job:
+                del self._jobs_by_key[old_job.key]
+
+    def _run(self, job: Job, engine: GeneratorEngine, workspace: SessionWorkspace, workbook=None):
+        with job._lock:
+            if job.status == "cancelled":
+                # Cancelled while waiting; cancel() has already finished it
+                return
+            job.started_at = time.time()
+            job.status = "running"
+        try:
+            self._store.set_status(job.id, "running", started_at=job.started_at)
+            job.add_event(f"{engine.mode} started")
+            job.budget.start()
+            result = engine.run(workspace, progress_callback=job.on_part_saved, workbook=workbook, line_callback=job.on_output_line, budget=job.budget, setup_callback=job.on_setup_done)
+            self._finish(job, engine, workspace, result)
+        except Exception:
+            # Never leave a job running (and holding a queue slot) because its bookkeeping failed
+            self._fail(job, traceback.format_exc())
+
+    def _finish(self, job: Job, engine: GeneratorEngine, workspace: SessionWorkspace, result: dict):
+        with job._lock:
+            if result["cancelled"]:
+                # The engine has deleted what the stopped run saved
+                job.paths, job.hashes = [], {}
+            elif not job.paths:
+                # Keep paths from the callbacks; fall back to the returned list for
+                # generators that saved without reporting progress
+                job.paths = list(result["paths"])
+                job.hashes = {path: file_digest(path) for path in job.paths if os.path.exists(path)}
+            job.stdout = result["stdout"]
+            job.error = result["cancelled"] or result["error"]
+            job.finished_at = time.time()
+        # Record the run's outputs, then apply the retention policy to the rest of the folder.
+        # The status flips last, so a finished job always has its manifest.
+        status = "cancelled" if result["cancelled"] else "failed" if result["error"] else "done"
+        manifest = job.build_manifest(status)
+        try:
+            write_manifest(workspace.graphics_dir, manifest)
+            prune_outputs(workspace.graphics_dir, keep={entry["path"] for entry in manifest["files"]})
+        except OSError as e:
+            print(f"Warning: Could not write manifest for {engine.mode}. {e}")
+        job.add_event(f"{engine.mode} {status} in {result['seconds']:.1f}s")
+        with job._lock:
+            job.manifest = manifest
+            job.status = status
+        self._store.set_status(job.id, status, finished_at=job.finished_at, error=job.error)
+
+    def _fail(self, job: Job, error: str):
+        """
+        Marks a job failed after an unexpected error outside the generator, in memory and in the job table.
+        """
+        with job._lock:
+            job.error = error
+            job.finished_at = time.time()
+            job.status = "failed"
+        job.add_event(f"{job.mode} failed")
+        try:
+            self._store.set_status(job.id, "failed", finished_at=job.finished_at, error=error)
+        except Exception as e:
+            # The row stays active until the next startup marks it interrupted
+            print(f"Warning: Could not record failed job {job.id}. {e}")
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+import pandas as pd
+from logo_index import LogoMatch, get_logo_index, folder_signature
+from workbooks import ResultsWorkbook, TableWorkbook, MatchOfTheDayWorkbook, model_digest
+
+# --- Configuration Constants ---
+MAX_CACHED_REPORTS = 32
+
+_REPORT_CACHE = OrderedDict()
+_REPORT_CACHE_LOCK = threading.Lock()
+
+
+def workbook_team_names(workbook) -> list[str]:
+    """
+    Every distinct team name a workbook model would draw a logo for, in first-seen order.
+    """
+    names = []
+    if isinstance(workbook, ResultsWorkbook):
+        for matches in workbook.divisions.values():
+            for match in matches:
+                names.extend((match.team_1_name, match.team_2_name))
+    elif isinstance(workbook, TableWorkbook):
+        for frame in workbook.divisions.values():
+            names.extend(frame["Team"].tolist())
+    elif isinstance(workbook, MatchOfTheDayWorkbook):
+        names.extend((workbook.match_data.get("home_team"), workbook.match_data.get("away_team")))
+    cleaned = (str(name).strip() for name in names if name is not None and not pd.isna(name))
+    return list(dict.fromkeys(name for name in cleaned if name))
+
+
+# --- Coverage Report ---
+@dataclass
+class LogoCoverage:
+    """
+    How every team in one workbook resolves against the logo index.
+    """
+    matches: list[LogoMatch]
+
+    def _with(self, predicate) -> list[LogoMatch]:
+        return [match for match in self.matches if predicate(match)]
+
+    @property
+    def missing(self) -> list[LogoMatch]:
+        return self._with(lambda match: match.path is None and not match.ambiguous)
+
+    @property
+    def ambiguous(self) -> list[LogoMatch]:
+        return self._with(lambda match: match.ambiguous)
+
+    @property
+    def aliased(self) -> list[LogoMatch]:
+        return self._with(lambda match: match.method == "alias")
+
+    @property
+    def fuzzy(self) -> list[LogoMatch]:
+        return self._with(lambda match: match.method == "fuzzy")
+
+    def summary(self) -> str:
+        parts = [f"{len(self.matches)} team(s)", f"{len(self.missing)} missing", f"{len(self.ambiguous)} ambiguous", f"{len(self.aliased)} aliased", f"{len(self.fuzzy)} fuzzy"]
+        return ", ".join(parts)
+
+
+def check_logo_coverage(logos_folder: str, workbook) -> LogoCoverage:
+    """
+    Resolves every team in workbook against the logos in one batch. Reports are
+    cached per workbook content and logo folder state, so repeating the check
+    for an unchanged workbook costs one hash.
+    """
+    key = (logos_folder, folder_signature(logos_folder), model_digest(workbook))
+    with _REPORT_CACHE_LOCK:
+        if key in _REPORT_CACHE:
+            _REPORT_CACHE.move_to_end(key)
+            return _REPORT_CACHE[key]
+    index = get_logo_index(logos_folder)
+    report = LogoCoverage([index.match(name, warn=False) for name in workbook_team_names(workbook)])
+    with _REPORT_CACHE_LOCK:
+        _REPORT_CACHE[key] = report
+        while len(_REPORT_CACHE) > MAX_CACHED_REPORTS:
+            _REPORT_CACHE.popitem(last=False)
+    return report
@@ -0,0 +1,232 @@
+import os
+import re
+import threading
+from collections import Counter
+from typing import NamedTuple, Optional
+
+# --- Configuration Constants ---
+# Searched in this order; the first folder holding a name wins
+LOGO_SUBFOLDERS = ("Current Teams", "Old Teams", "")
+LOGO_EXTENSIONS = (".png", ".jpg", ".jpeg")
+GENERIC_LOGO_FILENAME = "genericlogo.png"
+MIN_MATCH_SCORE = 0.6  # Trigram similarity below which a name counts as having no logo
+AMBIGUITY_MARGIN = 0.1  # Other logos scoring within this of the best make a match ambiguous
+# Trigram similarity at which two words count as the same word with a typo ("Tiger" and "Tigers")
+MIN_WORD_SCORE = 0.7
+# Ignored at either end of a key when comparing names fuzzily, so "Hook" finds "Hook FC"
+CLUB_AFFIXES = ("footballclub", "afc", "fc")
+# Ignored when comparing names word by word
+CLUB_WORDS = ("afc", "fc", "football", "club")
+# Team names (or parts of names) whose logo file is named differently
+SPECIAL_LOGO_MAPPING = {
+    "afc aldermaston a": "AFC Aldermaston.png",
+    "afc aldermaston b": "AFC Aldermaston.png",
+    "eversley & california sunday": "Eversley & California.png",
+}
+
+
+def normalize_name(name: str) -> str:
+    """
+    Lookup key for a team or logo file name: lower case, no spaces, "united" as
+    "utd", "&" as "and", and no file extension.
+    """
+    name = name.strip().lower()
+    for extension in LOGO_EXTENSIONS:
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+            break
+    return name.replace(" ", "").replace("united", "utd").replace("&", "and")
+
+
+def _core_key(key: str) -> str:
+    for affix in CLUB_AFFIXES:
+        if key.startswith(affix) and len(key) > len(affix):
+            key = key[len(affix):]
+            break
+    for affix in CLUB_AFFIXES:
+        if key.endswith(affix) and len(key) > len(affix):
+            key = key[:-len(affix)]
+            break
+    return key
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _dice(grams: set, other: set) -> float:
+    return 2 * len(grams & other) / (len(grams) + len(other))
+
+
+def _words(name: str) -> tuple:
+    """
+    The words of a team or logo file name that tell clubs apart, normalized like
+    normalize_name() but kept separate, without CLUB_WORDS.
+    """
+    name = name.strip().lower()
+    for extension in LOGO_EXTENSIONS:
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+            break
+    words = re.split(r"[^a-z0-9]+", name.replace("united", "utd").replace("&", " and "))
+    return tuple(word for word in words if word and word not in CLUB_WORDS)
+
+
+class LogoMatch(NamedTuple):
+    """
+    How a team name was matched to a logo. method is "alias", "exact", "fuzzy",
+    "ambiguous" or "none"; score is 1.0 for alias and exact matches, otherwise
+    the trigram similarity (0-1) of the best logo. An ambiguous name has no
+    path (the generic logo is drawn) and alternatives lists the logos that
+    scored too closely to choose between.
+    """
+    team_name: str
+    path: Optional[str]
+    method: str
+    score: float
+    alternatives: tuple = ()
+
+    @property
+    def ambiguous(self) -> bool:
+        return bool(self.alternatives)
+
+
+# --- Logo Index ---
+class LogoIndex:
+    """
+    Every logo in a Logos folder, scanned once and keyed by normalize_name().
+    A team name resolves, in order, to:
+
+    1. a SPECIAL_LOGO_MAPPING alias contained in the name;
+    2. the logo whose key equals the name's key;
+    3. the team logo whose key shares the most trigrams with the name's key,
+       ignoring CLUB_AFFIXES (e.g. "Hook" -> "Hook FC.jpg"), if it scores at
+       least MIN_MATCH_SCORE and every word of the name appears in the logo's
+       name, allowing for a typo (so "Oakridge C" never gets "Oakridge B FC").
+       If another such logo scores within AMBIGUITY_MARGIN of it, the name is
+       ambiguous and gets no logo rather than a guess.
+       Candidates come from a trigram index, so no file names are scanned.
+       League logos in the root folder only match exactly.
+
+    Results, including misses, are remembered, so each name is resolved once.
+    """
+
+    def __init__(self, logos_folder: str, aliases: dict = SPECIAL_LOGO_MAPPING):
+        self.logos_folder = logos_folder
+        self.paths = {}
+        self._team_keys = []
+        self._filenames = {}
+        for subfolder in LOGO_SUBFOLDERS:
+            folder = os.path.join(logos_folder, subfolder)
+            if not os.path.isdir(folder):
+                continue
+            for filename in sorted(os.listdir(folder)):
+                if filename.lower().endswith(LOGO_EXTENSIONS):
+                    path = os.path.join(folder, filename)
+                    key = normalize_name(filename)
+                    if key not in self.paths:
+                        self.paths[key] = path
+                        if subfolder:
+                            self._team_keys.append(key)
+                    self._filenames.setdefault(filename, path)
+        self.aliases = {normalize_name(alias): self._filenames[filename] for alias, filename in aliases.items() if filename in self._filenames}
+        self._key_trigrams = {key: _trigrams(_core_key(key)) for key in self._team_keys}
+        self._key_words = {key: [_trigrams(word) for word in _words(os.path.basename(self.paths[key]))] for key in self._team_keys}
+        self._postings = {}
+        for key, grams in self._key_trigrams.items():
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(key)
+        self._matches = {}
+        self._lock = threading.Lock()
+
+    @property
+    def generic_path(self) -> str:
+        return os.path.join(self.logos_folder, GENERIC_LOGO_FILENAME)
+
+    def _words_agree(self, words: list, candidate: str) -> bool:
+        # Every word of the team name has a counterpart in the logo's name; the logo may have more
+        return all(any(_dice(word, other) >= MIN_WORD_SCORE for other in self._key_words[candidate]) for word in words)
+
+    def _fuzzy_match(self, team_name: str, key: str) -> LogoMatch:
+        grams = _trigrams(_core_key(key))
+        words = [_trigrams(word) for word in _words(team_name)]
+        shared = Counter(candidate for gram in grams for candidate in self._postings.get(gram, ()))
+        # Dice similarity; ties go to the shorter (closer) key, then alphabetical order
+        scored = sorted(
+            ((2 * count / (len(grams) + len(self._key_trigrams[candidate])), candidate) for candidate, count in shared.items()),
+            key=lambda item: (-item[0], len(item[1]), item[1]),
+        )
+        best_score = scored[0][0] if scored else 0.0
+        scored = [(score, candidate) for score, candidate in scored if score >= MIN_MATCH_SCORE and self._words_agree(words, candidate)]
+        if not scored:
+            return LogoMatch(team_name, None, "none", best_score)
+        best_score, best_key = scored[0]
+        close = tuple(self.paths[candidate] for score, candidate in scored[1:] if best_score - score < AMBIGUITY_MARGIN)
+        if close:
+            # Drawing another club's crest is worse than the generic one
+            return LogoMatch(team_name, None, "ambiguous", best_score, (self.paths[best_key],) + close)
+        return LogoMatch(team_name, self.paths[best_key], "fuzzy", best_score)
+
+    def match(self, team_name: str, warn: bool = True) -> LogoMatch:
+        """
+        Matches team_name to a logo and says how (see LogoMatch).
+        With warn, an ambiguous match is reported the first time it is made.
+        """
+        key = normalize_name(team_name)
+        # Word boundaries matter to fuzzy matching, so "Oakridge C" and "OakridgeC" are kept apart
+        cache_key = (key, _words(team_name))
+        with self._lock:
+            if cache_key in self._matches:
+                return self._matches[cache_key]._replace(team_name=team_name)
+        alias_path = next((path for alias, path in self.aliases.items() if alias in key), None)
+        if alias_path is not None:
+            result = LogoMatch(team_name, alias_path, "alias", 1.0)
+        elif key in self.paths:
+            result = LogoMatch(team_name, self.paths[key], "exact", 1.0)
+        elif key:
+            result = self._fuzzy_match(team_name, key)
+        else:
+            result = LogoMatch(team_name, None, "none", 0.0)
+        with self._lock:
+            self._matches[cache_key] = result
+        if warn and result.ambiguous:
+            names = ", ".join(os.path.basename(path) for path in result.alternatives)
+            print(f"Warning: '{team_name.strip()}' could be {names}; using the generic logo.")
+        return result
+
+    def resolve(self, team_name: str) -> str:
+        """
+        Returns the logo path for team_name, or None if no logo matches.
+        """
+        return self.match(team_name).path
+
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def folder_signature(logos_folder: str) -> tuple:
+    # Adding, removing or renaming a logo changes its folder's mtime
+    signature = []
+    for subfolder in LOGO_SUBFOLDERS:
+        try:
+            signature.append(os.stat(os.path.join(logos_folder, subfolder)).st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def get_logo_index(logos_folder: str) -> LogoIndex:
+    """
+    Returns the shared index for logos_folder, rescanning only when the folder changes.
+    """
+    signature = folder_signature(logos_folder)
+    with _INDEXES_LOCK:
+        cached = _INDEXES.get(logos_folder)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    index = LogoIndex(logos_folder)
+    with _INDEXES_LOCK:
+        _INDEXES[logos_folder] = (signature, index)
+    return index
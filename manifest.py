@@ -0,0 +1,104 @@
+import os
+import json
+import time
+
+# --- Configuration Constants ---
+MANIFEST_DIRNAME = ".manifests"
+OUTPUT_EXTENSIONS = (".png",)
+OUTPUT_MAX_AGE_SECONDS = 6 * 60 * 60
+OUTPUT_MAX_TOTAL_BYTES = 200 * 1024 * 1024
+
+
+# --- Manifests ---
+def build_manifest(run_id: str, mode: str, started_at: float, finished_at: float, status: str, files: list[dict], setup_seconds: float = None) -> dict:
+    """
+    Describes exactly what one generation run produced. Each entry in files has
+    'path', 'part', 'size', 'sha1' and 'render_seconds' (None if the generator
+    did not report the part as it was saved). setup_seconds is the time spent
+    before the first part started rendering (workbook load, logo checks).
+    """
+    return {
+        "run_id": run_id,
+        "mode": mode,
+        "status": status,
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "seconds": (finished_at - started_at) if started_at and finished_at else None,
+        "setup_seconds": setup_seconds,
+        "total_bytes": sum(entry["size"] for entry in files),
+        "files": files,
+    }
+
+
+def manifest_path(graphics_dir: str, run_id: str) -> str:
+    return os.path.join(graphics_dir, MANIFEST_DIRNAME, f"{run_id}.json")
+
+
+def write_manifest(graphics_dir: str, manifest: dict) -> str:
+    """
+    Saves the manifest next to the outputs (atomically) and returns its path.
+    """
+    path = manifest_path(graphics_dir, manifest["run_id"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def manifest_outputs(manifest: dict) -> list[tuple[str, str]]:
+    """
+    Returns the (path, content hash) pairs of a manifest's files that still exist.
+    """
+    return [(entry["path"], entry["sha1"]) for entry in manifest["files"] if os.path.exists(entry["path"])]
+
+
+# --- Retention ---
+def prune_outputs(graphics_dir: str, keep: set = frozenset(), max_age_seconds: float = OUTPUT_MAX_AGE_SECONDS, max_total_bytes: int = OUTPUT_MAX_TOTAL_BYTES, extensions: tuple = OUTPUT_EXTENSIONS) -> list[str]:
+    """
+    Deletes outputs older than max_age_seconds, then the oldest remaining ones
+    until the folder holds at most max_total_bytes. Paths in keep (the run that
+    just finished) are never removed. Manifests go once their outputs are gone.
+    Returns the list of removed files.
+    """
+    removed = []
+    if not os.path.isdir(graphics_dir):
+        return removed
+    cutoff = time.time() - max_age_seconds
+    outputs = []
+    for entry in os.scandir(graphics_dir):
+        if entry.is_file() and entry.name.lower().endswith(extensions):
+            stat = entry.stat()
+            outputs.append((stat.st_mtime, stat.st_size, entry.path))
+    outputs.sort()
+
+    total_bytes = sum(size for _, size, _ in outputs)
+    for mtime, size, path in outputs:
+        if path in keep:
+            continue
+        if mtime >= cutoff and total_bytes <= max_total_bytes:
+            continue
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Warning: Could not remove old output {path}. {e}")
+            continue
+        total_bytes -= size
+        removed.append(path)
+
+    manifests_dir = os.path.join(graphics_dir, MANIFEST_DIRNAME)
+    if os.path.isdir(manifests_dir):
+        for entry in os.scandir(manifests_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    files = json.load(f).get("files", [])
+            except (OSError, ValueError):
+                files = []
+            outputs_gone = files and not any(os.path.exists(item["path"]) for item in files)
+            if outputs_gone or entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed.append(entry.path)
+    return removed
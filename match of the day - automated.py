@@ -2,17 +2,23 @@ from PIL import Image, ImageDraw, ImageFont, ImageColor
 import os
 from datetime import datetime
 import pandas as pd # Import pandas for Excel reading
+from assets import load_font, load_template, load_logo
+from logo_index import get_logo_index
+from budget import checkpoint
 
 # --- Configuration Constants ---
-# Paths
-LOGOS_FOLDER = "Logos"
-SAVE_FOLDER = "Graphics"
-TEMPLATES_FOLDER = "Templates"
-MATCH_OF_THE_DAY_TEMPLATE_PATH = os.path.join(TEMPLATES_FOLDER, "match_of_the_day_template.png")
+# Paths (relative to this script, never to the current working directory)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOGOS_FOLDER = os.path.join(BASE_DIR, "Logos")
+SAVE_FOLDER = os.path.join(BASE_DIR, "Graphics")
+TEMPLATES_FOLDER = os.path.join(BASE_DIR, "Templates")
+MATCH_OF_THE_DAY_TEMPLATE_FILENAME = "match_of_the_day_template.png"
 # New template for results with many scorers (no footer)
-MATCH_OF_THE_DAY_RESULT_TEMPLATE_NO_FOOTER_PATH = os.path.join(TEMPLATES_FOLDER, "match_of_the_day_result_template.png")
-FONT_PATH = "BebasKai.ttf"  # Already in repo root
-MATCH_DATA_EXCEL_PATH = "match of the day.xlsx"
+MATCH_OF_THE_DAY_RESULT_TEMPLATE_NO_FOOTER_FILENAME = "match_of_the_day_result_template.png"
+MATCH_OF_THE_DAY_TEMPLATE_PATH = os.path.join(TEMPLATES_FOLDER, MATCH_OF_THE_DAY_TEMPLATE_FILENAME)
+MATCH_OF_THE_DAY_RESULT_TEMPLATE_NO_FOOTER_PATH = os.path.join(TEMPLATES_FOLDER, MATCH_OF_THE_DAY_RESULT_TEMPLATE_NO_FOOTER_FILENAME)
+FONT_PATH = os.path.join(BASE_DIR, "BebasKai.ttf")  # Already in repo root
+MATCH_DATA_EXCEL_PATH = os.path.join(BASE_DIR, "match of the day.xlsx")
 
 # Image Dimensions
 IMAGE_WIDTH = 1080
@@ -62,76 +68,29 @@ DIVISION_BAR_RESULT_Y_OFFSET = 5 # Adjust this value to move the division bar do
 # to fine-tune the vertical position of the "FINAL SCORE" text.
 FINAL_SCORE_VERTICAL_ADJUSTMENT = -40 # Moved down by 10px from -50 to -40
 
-# Special Team Logo Mappings (e.g., variants pointing to a single logo file)
-SPECIAL_LOGO_MAPPING = {
-    "afc aldermaston a": "AFC Aldermaston.png",
-    "afc aldermaston b": "AFC Aldermaston.png",
-    "eversley & california sunday": "Eversley & California.png",
-}
+# Special team logo mappings (variants pointing to a single logo file) live in logo_index.SPECIAL_LOGO_MAPPING
 
 # --- Helper Functions (Copied and improved from previous Canvas) ---
 
 def get_logo(team_name: str, logos_folder: str) -> Image.Image:
     """
-    Loads a team logo, handling specific variants and searching subfolders.
-    Prioritizes exact matches, then "utd"/"united" and "&"/"and" variations, then generic.
-    Falls back to a gray placeholder if generic logo is not found.
+    Loads a team logo at LOGO_DISPLAY_SIZE through the shared logo index, which
+    handles special mappings and "utd"/"united" and "&"/"and" variations.
+    Falls back to the generic logo, then to a gray placeholder.
     """
-    valid_extensions = ('.png', '.jpg', '.jpeg')
-    team_name_lower = team_name.strip().lower()
-
-    # Create search variations
-    team_name_search_variants = [team_name_lower.replace(" ", "")]
-
-    # Handle "utd" and "united" variations
-    if "utd" in team_name_lower:
-        team_name_search_variants.append(team_name_lower.replace("utd", "united").replace(" ", ""))
-    if "united" in team_name_lower:
-        team_name_search_variants.append(team_name_lower.replace("united", "utd").replace(" ", ""))
-
-    # Handle "&" and "and" variations
-    if "&" in team_name_lower:
-        team_name_search_variants.append(team_name_lower.replace("&", "and").replace(" ", ""))
-    if "and" in team_name_lower:
-        team_name_search_variants.append(team_name_lower.replace("and", "&").replace(" ", ""))
-
-    # Ensure unique variants
-    team_name_search_variants = list(set(team_name_search_variants))
-
-    # 1. Check for special logo mappings first (e.g., AFC Aldermaston A/B, Eversley & California Sunday)
-    for variant_key, logo_filename in SPECIAL_LOGO_MAPPING.items():
-        if variant_key in team_name_lower:
-            for subfolder in ['Current Teams', 'Old Teams', '']: # Search subfolders and root
-                search_path = os.path.join(logos_folder, subfolder, logo_filename)
-                if os.path.exists(search_path):
-                    try:
-                        return Image.open(search_path).convert("RGBA")
-                    except Exception as e:
-                        print(f"Error loading mapped logo '{logo_filename}' for {team_name} from '{search_path}': {e}")
-                        break # Stop trying this mapped logo if it fails
-
-    # 2. General search for logo files based on name variations
-    for subfolder in ['Current Teams', 'Old Teams', '']: # Search subfolders and root
-        current_search_dir = os.path.join(logos_folder, subfolder)
-        if not os.path.isdir(current_search_dir):
-            continue
-
-        for filename in os.listdir(current_search_dir):
-            filename_clean_no_space = filename.strip().lower().replace(" ", "")
-            if any(variant in filename_clean_no_space for variant in team_name_search_variants) and filename_clean_no_space.endswith(valid_extensions):
-                logo_path = os.path.join(current_search_dir, filename)
-                try:
-                    return Image.open(logo_path).convert("RGBA")
-                except Exception as e:
-                    print(f"Error loading logo for {team_name} from '{logo_path}': {e}")
-                    continue # Try next file in the same directory
-
-    # 3. Use generic logo as a last resort
-    generic_logo_path = os.path.join(logos_folder, 'genericlogo.png')
+    index = get_logo_index(logos_folder)
+    logo_path = index.resolve(team_name)
+    if logo_path:
+        try:
+            return load_logo(logo_path, LOGO_DISPLAY_SIZE)
+        except Exception as e:
+            print(f"Error loading logo for {team_name} from '{logo_path}': {e}")
+
+    # Use generic logo as a last resort
+    generic_logo_path = index.generic_path
     try:
         print(f"Warning: No specific logo found for {team_name}. Using generic logo.")
-        # Ensure generic logo is resized to the expected size for MOTD
-        return Image.open(generic_logo_path).convert("RGBA").resize(LOGO_DISPLAY_SIZE, Image.Resampling.LANCZOS)
+        return load_logo(generic_logo_path, LOGO_DISPLAY_SIZE)
     except Exception as e:
         print(f"Error loading generic logo: {e}. Using gray placeholder.")
         return Image.new("RGBA", LOGO_DISPLAY_SIZE, (200, 200, 200, 255))
@@ -244,9 +203,10 @@ def read_match_data_from_excel(file_path: str) -> dict:
 
 # --- Main Graphic Generation Function ---
 
-def create_match_of_the_day_graphic(match_data: dict, logos_folder: str, save_folder: str, is_result: bool = False):
+def create_match_of_the_day_graphic(match_data: dict, logos_folder: str, save_folder: str, is_result: bool = False, templates_folder: str = TEMPLATES_FOLDER, font_path: str = FONT_PATH):
     """
     Creates the Match of the Day graphic, either as a preview or a result.
+    Returns the saved file path, or None if the graphic could not be generated.
     """
     # Initialize drawing context with fontmode="L" for smooth rendering
     # This needs to be done early to calculate text dimensions for template selection.
@@ -256,11 +216,11 @@ def create_match_of_the_day_graphic(match_data: dict, logos_folder: str, save_fo
 
     # Load fonts for text measurement
     try:
-        font_details_for_measure = ImageFont.truetype(FONT_PATH, FONT_SIZE_DETAILS)
-        font_scorers_for_measure = ImageFont.truetype(FONT_PATH, FONT_SIZE_SCORERS)
-        font_final_score_for_measure = ImageFont.truetype(FONT_PATH, FONT_SIZE_FINAL_SCORE)
+        font_details_for_measure = load_font(font_path, FONT_SIZE_DETAILS)
+        font_scorers_for_measure = load_font(font_path, FONT_SIZE_SCORERS)
+        font_final_score_for_measure = load_font(font_path, FONT_SIZE_FINAL_SCORE)
     except IOError as e:
-        print(f"Error loading font from {FONT_PATH} for measurement: {e}. Using default font.")
+        print(f"Error loading font from {font_path} for measurement: {e}. Using default font.")
         font_details_for_measure = font_scorers_for_measure = font_final_score_for_measure = ImageFont.load_default()
 
     # Match data extraction for template selection
@@ -268,7 +228,7 @@ def create_match_of_the_day_graphic(match_data: dict, logos_folder: str, save_fo
     away_scorers = match_data.get("away_scorers", [])
 
     # Determine template to use based on scorer lines for result graphic
-    template_to_load = MATCH_OF_THE_DAY_TEMPLATE_PATH
+    template_to_load = os.path.join(templates_folder, MATCH_OF_THE_DAY_TEMPLATE_FILENAME)
     if is_result:
         home_scorers_text_combined = ", ".join(home_scorers)
         away_scorers_text_combined = ", ".join(away_scorers)
@@ -277,16 +237,16 @@ def create_match_of_the_day_graphic(match_data: dict, logos_folder: str, save_fo
         away_scorers_lines = wrap_text(away_scorers_text_combined, font_scorers_for_measure, MAX_TEAM_NAME_WIDTH - TEAM_NAME_INTERNAL_PADDING, dummy_draw)
 
         if len(home_scorers_lines) >= 3 or len(away_scorers_lines) >= 3:
-            template_to_load = MATCH_OF_THE_DAY_RESULT_TEMPLATE_NO_FOOTER_PATH
+            template_to_load = os.path.join(templates_folder, MATCH_OF_THE_DAY_RESULT_TEMPLATE_NO_FOOTER_FILENAME)
 
     # Load the determined template (1080x1350)
     try:
-        img = Image.open(template_to_load).convert("RGBA")
+        img = load_template(template_to_load).copy()
         if img.size != (IMAGE_WIDTH, IMAGE_HEIGHT):
             print(f"Warning: Template '{template_to_load}' is not {IMAGE_WIDTH}x{IMAGE_HEIGHT}. Resizing might occur or layout issues may arise.")
     except Exception as e:
         print(f"Error loading template: {e}. Skipping graphic generation.")
-        return
+        return None
 
     # Initialize drawing context for the actual image
     draw = ImageDraw.Draw(img)
@@ -294,13 +254,13 @@ def create_match_of_the_day_graphic(match_data: dict, logos_folder: str, save_fo
 
     # Load fonts for actual drawing
     try:
-        font_details = ImageFont.truetype(FONT_PATH, FONT_SIZE_DETAILS)
-        font_final_score = ImageFont.truetype(FONT_PATH, FONT_SIZE_FINAL_SCORE)
-        font_team = ImageFont.truetype(FONT_PATH, FONT_SIZE_TEAM_NAME)
-        font_vs = ImageFont.truetype(FONT_PATH, FONT_SIZE_VS_SCORE)
-        font_scorers = ImageFont.truetype(FONT_PATH, FONT_SIZE_SCORERS)
+        font_details = load_font(font_path, FONT_SIZE_DETAILS)
+        font_final_score = load_font(font_path, FONT_SIZE_FINAL_SCORE)
+        font_team = load_font(font_path, FONT_SIZE_TEAM_NAME)
+        font_vs = load_font(font_path, FONT_SIZE_VS_SCORE)
+        font_scorers = load_font(font_path, FONT_SIZE_SCORERS)
     except IOError as e:
-        print(f"Error loading font from {FONT_PATH}: {e}. Using default font.")
+        print(f"Error loading font from {font_path}: {e}. Using default font.")
         font_details = font_team = font_vs = font_final_score = font_scorers = ImageFont.load_default()
 
     # Match data extraction (repeated for clarity, could be passed as argument)
@@ -317,7 +277,7 @@ def create_match_of_the_day_graphic(match_data: dict, logos_folder: str, save_fo
     # Calculate base_y_shift for elements below the top section if FINAL SCORE is used
     OLD_FINAL_SCORE_FONT_SIZE = 76 # This was the original font size for FINAL SCORE
     try:
-        old_final_score_font = ImageFont.truetype(FONT_PATH, OLD_FINAL_SCORE_FONT_SIZE)
+        old_final_score_font = load_font(font_path, OLD_FINAL_SCORE_FONT_SIZE)
     except IOError:
         old_final_score_font = ImageFont.load_default()
 
@@ -389,8 +349,8 @@ def create_match_of_the_day_graphic(match_data: dict, logos_folder: str, save_fo
     draw.text((division_x, division_y), division_text, fill=TEXT_COLOR, font=font_details)
 
     # --- Team Logos ---
-    home_logo = get_logo(home_team, logos_folder).resize(LOGO_DISPLAY_SIZE, Image.Resampling.LANCZOS)
-    away_logo = get_logo(away_team, logos_folder).resize(LOGO_DISPLAY_SIZE, Image.Resampling.LANCZOS)
+    home_logo = get_logo(home_team, logos_folder)
+    away_logo = get_logo(away_team, logos_folder)
     
     # Logos are positioned at fixed X, and calculated Y to align with Y_POS_LOGOS, applying base_y_shift for results
     logo_y = Y_POS_LOGOS + (base_y_shift if is_result else 0)
@@ -470,31 +430,48 @@ def create_match_of_the_day_graphic(match_data: dict, logos_folder: str, save_fo
     # Save the image
     current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     suffix = "result" if is_result else "preview"
+    os.makedirs(save_folder, exist_ok=True)
     output_file_path = os.path.join(save_folder, f"match_of_the_day_{suffix}_{current_time}.png")
     img.save(output_file_path)
     print(f"Graphic saved to: {output_file_path}")
-    img.show()
+    return output_file_path
 
-# Example usage
-if __name__ == "__main__":
+
+# --- Main function to generate both graphics ---
+def generate_match_of_the_day_graphics(file_path: str, logos_folder: str, save_folder: str, templates_folder: str = TEMPLATES_FOLDER, font_path: str = FONT_PATH, progress_callback=None, workbook=None) -> list[str]:
+    """
+    Reads the match data workbook and creates the preview and result graphics.
+    progress_callback, if given, is called as (part_number, total_parts, path) after each save.
+    Returns the list of saved graphic paths.
+    """
     # Load match data from Excel
-    loaded_match_data = read_match_data_from_excel(MATCH_DATA_EXCEL_PATH)
+    if workbook is not None:
+        loaded_match_data = workbook.match_data
+    else:
+        loaded_match_data = read_match_data_from_excel(file_path)
+    saved_paths = []
 
-    if loaded_match_data:
-        # Generate preview graphic
-        create_match_of_the_day_graphic(
-            loaded_match_data,
-            LOGOS_FOLDER,
-            SAVE_FOLDER,
-            is_result=False
-        )
+    if not loaded_match_data:
+        print("Could not load match data from Excel. Please check the file path and format.")
+        return saved_paths
 
-        # Generate result graphic
-        create_match_of_the_day_graphic(
+    # Generate preview graphic, then result graphic
+    for part_number, is_result in enumerate((False, True), start=1):
+        checkpoint()
+        path = create_match_of_the_day_graphic(
             loaded_match_data,
-            LOGOS_FOLDER,
-            SAVE_FOLDER,
-            is_result=True
+            logos_folder,
+            save_folder,
+            is_result=is_result,
+            templates_folder=templates_folder,
+            font_path=font_path
         )
-    else:
-        print("Could not load match data from Excel. Please check the file path and format.")
+        if path:
+            saved_paths.append(path)
+            if progress_callback:
+                progress_callback(part_number, 2, path)
+    return saved_paths
+
+# Example usage
+if __name__ == "__main__":
+    generate_match_of_the_day_graphics(MATCH_DATA_EXCEL_PATH, LOGOS_FOLDER, SAVE_FOLDER)
@@ -0,0 +1,88 @@
+import io
+import time
+from datetime import datetime
+from types import ModuleType
+from engine import capture_thread_output
+from workbooks import ResultsWorkbook, CUP_SHEET
+
+
+# --- Live Results Preview ---
+class ResultsPreview:
+    """
+    Keeps the last rendered image of every Results part and brings them up to
+    date with as little drawing as possible:
+
+    - parts whose layout is unchanged only have their edited rows patched;
+    - parts whose layout changed (rows added/removed, cup names edited), or where
+      an edited row's names (before or after) are too tall for its band, are redrawn;
+    - a new date redraws everything.
+    """
+
+    def __init__(self, module: ModuleType, logos_folder: str, template_path: str, font_path: str):
+        self.module = module
+        self.logos_folder = logos_folder
+        self.template_path = template_path
+        self.font_path = font_path
+        self.date = None
+        self.pages = []
+        self.images = []
+        self.rows = []
+        self.last_update_seconds = 0.0
+
+    @staticmethod
+    def _layout(sections: list[tuple]) -> tuple:
+        # Row positions depend only on the sections and each row's cup name
+        return tuple((div_name, tuple(match[4] for match in matches)) for div_name, matches in sections)
+
+    def _plan(self, workbook: ResultsWorkbook) -> list[list[tuple]]:
+        league_divisions = []
+        for division in self.module.LEAGUE_DIVISION_ORDER:
+            matches = workbook.matches(division)
+            if matches:
+                league_divisions.append({'division': division, 'matches': matches})
+        # The planner narrates its decisions; keep that out of the server log
+        with capture_thread_output(io.StringIO()):
+            return self.module.plan_result_pages(workbook.matches(CUP_SHEET), league_divisions)
+
+    def _can_patch(self, part_rows: list[tuple], new_matches: list[tuple]) -> bool:
+        fits = self.module.result_row_fits
+        return all(
+            fits(old_match, div_name, y_offset, self.font_path) and fits(match, div_name, y_offset, self.font_path)
+            for (div_name, old_match, y_offset), match in zip(part_rows, new_matches)
+            if match != old_match
+        )
+
+    def update(self, workbook: ResultsWorkbook) -> list[int]:
+        """
+        Brings the preview in line with workbook.
+        Returns the (1-based) numbers of the parts that changed.
+        """
+        start = time.perf_counter()
+        date = workbook.date if workbook.date is not None else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        pages = self._plan(workbook)
+        redraw_all = date != self.date
+        dirty = []
+        images, rows = [], []
+        with capture_thread_output(io.StringIO()):
+            for index, sections in enumerate(pages):
+                previous = self.pages[index] if index < len(self.pages) else None
+                new_matches = [match for _, matches in sections for match in matches]
+                if (redraw_all or previous is None or self._layout(previous) != self._layout(sections)
+                        or not self._can_patch(self.rows[index], new_matches)):
+                    image, part_rows = self.module.render_results_part(sections, self.logos_folder, self.template_path, date, self.font_path)
+                    dirty.append(index + 1)
+                else:
+                    image, part_rows = self.images[index], self.rows[index]
+                    patched_rows = []
+                    for (div_name, old_match, y_offset), match in zip(part_rows, new_matches):
+                        if match != old_match:
+                            self.module.patch_result_row(image, match, div_name, y_offset, self.logos_folder, self.template_path, self.font_path)
+                        patched_rows.append((div_name, match, y_offset))
+                    if patched_rows != part_rows:
+                        dirty.append(index + 1)
+                    part_rows = patched_rows
+                images.append(image)
+                rows.append(part_rows)
+        self.date, self.pages, self.images, self.rows = date, pages, images, rows
+        self.last_update_seconds = time.perf_counter() - start
+        return dirty
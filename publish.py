@@ -0,0 +1,67 @@
+import os
+import shutil
+import hashlib
+import threading
+from manifest import prune_outputs
+
+# --- Configuration Constants ---
+# Streamlit serves <app folder>/static at app/static/ when server.enableStaticServing is on
+STATIC_DIRNAME = "static"
+PUBLISHED_DIRNAME = "graphics"
+STATIC_URL_PREFIX = "app/static"
+PUBLISHED_EXTENSIONS = (".png", ".zip")
+PUBLISHED_MAX_AGE_SECONDS = 24 * 60 * 60
+PUBLISHED_MAX_TOTAL_BYTES = 500 * 1024 * 1024
+
+
+def published_dir(app_root: str) -> str:
+    return os.path.join(app_root, STATIC_DIRNAME, PUBLISHED_DIRNAME)
+
+
+def published_url(filename: str) -> str:
+    return f"{STATIC_URL_PREFIX}/{PUBLISHED_DIRNAME}/{filename}"
+
+
+def _publish_file(source_path: str, dest_path: str):
+    tmp_path = f"{dest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        # A hard link costs no copy; fall back to copying across filesystems
+        os.link(source_path, tmp_path)
+    except OSError:
+        shutil.copyfile(source_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+
+
+def publish_output(path: str, digest: str, app_root: str) -> str:
+    """
+    Makes an output available as a static file named by its content hash and
+    returns its URL. Identical content is published once and browsers can cache it.
+    """
+    filename = digest + os.path.splitext(path)[1].lower()
+    dest_path = os.path.join(published_dir(app_root), filename)
+    if not os.path.exists(dest_path):
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        _publish_file(path, dest_path)
+    return published_url(filename)
+
+
+def publish_bytes(data: bytes, extension: str, app_root: str) -> str:
+    """
+    Like publish_output, for content that only exists in memory (e.g. a ZIP bundle).
+    """
+    filename = hashlib.sha1(data).hexdigest() + extension
+    dest_path = os.path.join(published_dir(app_root), filename)
+    if not os.path.exists(dest_path):
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        tmp_path = f"{dest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, dest_path)
+    return published_url(filename)
+
+
+def prune_published(app_root: str, max_age_seconds: float = PUBLISHED_MAX_AGE_SECONDS, max_total_bytes: int = PUBLISHED_MAX_TOTAL_BYTES) -> list[str]:
+    """
+    Applies the output retention policy to the static folder.
+    """
+    return prune_outputs(published_dir(app_root), max_age_seconds=max_age_seconds, max_total_bytes=max_total_bytes, extensions=PUBLISHED_EXTENSIONS)
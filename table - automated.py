@@ -2,6 +2,9 @@ import os
 from PIL import Image, ImageDraw, ImageFont
 import pandas as pd
 from datetime import datetime
+from assets import load_font, load_template, load_logo
+from logo_index import get_logo_index, normalize_name
+from budget import checkpoint
 
 # --- Configuration Constants ---
 # Use os.path.dirname(__file__) to get the directory where the script is running
@@ -63,134 +66,31 @@ DIVISION_TEMPLATES = {
     "Division 4": "division_4_league_template.png",
 }
 
-# Special Team Logo Mappings (Maps variant key to the actual logo filename)
-SPECIAL_LOGO_MAPPING = {
-    "afc aldermaston a": "AFC Aldermaston.png",
-    "afc aldermaston b": "AFC Aldermaston.png",
-    "eversley & california sunday": "Eversley & California.png",
-}
-
-# Global logo lookup map
-LOGO_LOOKUP_MAP = {}
-LOGO_LOOKUP_INITIALIZED = False
+# Special team logo mappings (variant key -> logo filename) live in logo_index.SPECIAL_LOGO_MAPPING
 
 # --- Helper Functions ---
-def normalize_name(name: str) -> str:
-    """Normalizes a team or filename by converting to lower, removing spaces, and replacing common variants."""
-    name = name.strip().lower()
-    name = name.replace(" ", "")
-    name = name.replace("united", "utd")
-    name = name.replace("&", "and")
-    return name.split('.')[0] # Remove file extension
-
-def build_logo_lookup(logos_folder: str):
-    """
-    Scans the Logos folder and subfolders to build a case/space-insensitive lookup map.
-    Key: Normalized team name from the table (e.g., 'republicofchineham')
-    Value: Full path to the actual logo file (e.g., '/.../Logos/Current Teams/Republic of Chineham.png')
-    """
-    global LOGO_LOOKUP_MAP, LOGO_LOOKUP_INITIALIZED
-    if LOGO_LOOKUP_INITIALIZED:
-        return
-
-    LOGO_LOOKUP_MAP = {}
-    valid_extensions = ('.png', '.jpg', '.jpeg')
-    search_dirs = [logos_folder]
-    # Check for Current Teams and Old Teams subfolders
-    for subfolder in ['Current Teams', 'Old Teams']:
-        sub_path = os.path.join(logos_folder, subfolder)
-        if os.path.isdir(sub_path):
-            search_dirs.append(sub_path)
-
-    for current_dir in search_dirs:
-        try:
-            for filename in os.listdir(current_dir):
-                if filename.lower().endswith(valid_extensions):
-                    # For lookup key, normalize the base filename (without extension)
-                    base_name, ext = os.path.splitext(filename)
-                    key = normalize_name(base_name)
-                    
-                    # For value, store the exact full path
-                    full_path = os.path.join(current_dir, filename)
-                    
-                    # Store the key-value pair
-                    if key not in LOGO_LOOKUP_MAP:
-                        LOGO_LOOKUP_MAP[key] = full_path
-        except FileNotFoundError:
-            # This happens if LOGOS_FOLDER itself is missing, handled by caller
-            pass
-        except Exception as e:
-            print(f"Error scanning logo directory {current_dir}: {e}")
-
-    # Add special mappings to the lookup, keyed by their normalized input name
-    for variant_key, actual_filename in SPECIAL_LOGO_MAPPING.items():
-        # This part requires searching the disk again based on the specific filename
-        key = normalize_name(variant_key)
-        
-        # Search for the mapped filename in subfolders
-        for subfolder in ['Current Teams', 'Old Teams', '']:
-            search_path = os.path.join(logos_folder, subfolder, actual_filename)
-            if os.path.exists(search_path):
-                if key not in LOGO_LOOKUP_MAP:
-                    LOGO_LOOKUP_MAP[key] = search_path
-                break
-    
-    LOGO_LOOKUP_INITIALIZED = True
-    print(f"DEBUG: Logo lookup map built with {len(LOGO_LOOKUP_MAP)} unique logos.")
-
-
 def get_logo(team_name: str, logos_folder: str) -> Image.Image:
     """
-    Loads a team logo using the pre-built lookup map for case/space insensitivity.
+    Loads a team logo using the shared logo index for case/space insensitivity.
     Returns a resized PIL Image object.
     """
-    if not LOGO_LOOKUP_INITIALIZED:
-        build_logo_lookup(logos_folder)
-        if not LOGO_LOOKUP_MAP:
-            print("CRITICAL: Logo folder is empty or not found. Cannot proceed with logo search.")
+    index = get_logo_index(logos_folder)
+    if not index.paths:
+        print("CRITICAL: Logo folder is empty or not found. Cannot proceed with logo search.")
 
-    # 1. Generate normalized keys for the input team name
-    team_name_lower = team_name.strip().lower()
-    
-    # Check special mappings first (which use full team name variants)
-    logo_path = None
-    for variant_key in SPECIAL_LOGO_MAPPING.keys():
-        if variant_key in team_name_lower:
-            key = normalize_name(variant_key)
-            logo_path = LOGO_LOOKUP_MAP.get(key)
-            if logo_path:
-                break
-    
-    # Check standard team name mapping
-    if not logo_path:
-        main_key = normalize_name(team_name)
-        logo_path = LOGO_LOOKUP_MAP.get(main_key)
-    
-    # Check for variations if main key failed
-    if not logo_path:
-        # Check 'united'/'utd' variations
-        if 'utd' in main_key:
-            alt_key = main_key.replace("utd", "united")
-            logo_path = LOGO_LOOKUP_MAP.get(alt_key)
-        elif 'united' in main_key:
-            alt_key = main_key.replace("united", "utd")
-            logo_path = LOGO_LOOKUP_MAP.get(alt_key)
-    
-    # 2. Load and return the found logo
+    logo_path = index.resolve(team_name)
     if logo_path:
         try:
-            img = Image.open(logo_path).convert("RGBA").resize((LOGO_SIZE, LOGO_SIZE), Image.LANCZOS)
-            return img
+            return load_logo(logo_path, (LOGO_SIZE, LOGO_SIZE))
         except Exception as e:
             print(f"Error loading final logo for {team_name} from '{logo_path}': {e}")
-            
-    # 3. Fallback to generic logo
+
+    # Fallback to generic logo
     print(f"Error: Could not find specific logo for team '{team_name.strip()}' (normalized: '{normalize_name(team_name)}').")
 
-    generic_logo_path = os.path.join(logos_folder, 'genericlogo.png')
+    generic_logo_path = index.generic_path
     try:
-        # Note: Added .resize here as it was missing in your local version
-        return Image.open(generic_logo_path).convert("RGBA").resize((LOGO_SIZE, LOGO_SIZE), Image.LANCZOS) 
+        return load_logo(generic_logo_path, (LOGO_SIZE, LOGO_SIZE))
     except Exception as e:
         print(f"Error loading generic logo: {e}. Using gray placeholder.")
         return Image.new("RGBA", (LOGO_SIZE, LOGO_SIZE), (200, 200, 200, 255))
@@ -260,24 +160,25 @@ def get_wrapped_text_block_height(lines: list[str], font: ImageFont.FreeTypeFont
     return total_height
 
 # --- Main Graphic Generation Function ---
-def create_league_table_graphic(league_data: pd.DataFrame, logos_folder: str, save_folder: str, division_name: str, current_date: datetime):
+def create_league_table_graphic(league_data: pd.DataFrame, logos_folder: str, save_folder: str, division_name: str, current_date: datetime, templates_folder: str = TEMPLATES_FOLDER, font_path: str = FONT_PATH):
     """
     Creates a league table graphic for a specific division with a date circle.
+    Returns the saved file path, or None if the graphic could not be generated.
     """
     template_filename = DIVISION_TEMPLATES.get(division_name, "division_1_league_template.png")
-    template_path = os.path.join(TEMPLATES_FOLDER, template_filename)
+    template_path = os.path.join(templates_folder, template_filename)
     try:
-        img = Image.open(template_path).convert("RGBA")
+        img = load_template(template_path).copy()
         if img.size != (IMAGE_WIDTH, IMAGE_HEIGHT):
             print(f"Warning: Template '{template_filename}' is not {IMAGE_WIDTH}x{IMAGE_HEIGHT}. Resizing might occur or layout issues may arise.")
     except Exception as e:
         print(f"Error loading template for {division_name} from '{template_path}': {e}. Skipping graphic generation.")
-        return
+        return None
 
     # Load fonts
     try:
-        font = ImageFont.truetype(FONT_PATH, FONT_SIZE_NORMAL)
-        header_font = ImageFont.truetype(FONT_PATH, FONT_SIZE_HEADER)
+        font = load_font(font_path, FONT_SIZE_NORMAL)
+        header_font = load_font(font_path, FONT_SIZE_HEADER)
     except IOError:
         font = header_font = ImageFont.load_default()
 
@@ -297,7 +198,7 @@ def create_league_table_graphic(league_data: pd.DataFrame, logos_folder: str, sa
     
     while font_size >= FONT_SIZE_DATE_MIN:
         try:
-            date_font = ImageFont.truetype(FONT_PATH, int(font_size * HIGH_RES_SCALE))
+            date_font = load_font(font_path, int(font_size * HIGH_RES_SCALE))
         except IOError:
             date_font = ImageFont.load_default() 
 
@@ -362,6 +263,7 @@ def create_league_table_graphic(league_data: pd.DataFrame, logos_folder: str, sa
 
     # Loop through teams
     for _, row in league_data.iterrows():
+        checkpoint()
         pos = str(row.get('Pos', ''))
         team_name = str(row.get('Team', ''))
         played = str(row.get('P', ''))
@@ -426,22 +328,22 @@ def create_league_table_graphic(league_data: pd.DataFrame, logos_folder: str, sa
     output_file_path = os.path.join(save_folder, f"{division_name}_League_Table_{current_time}.png")
     img.save(output_file_path)
     print(f"Graphic saved to: {output_file_path}")
+    return output_file_path
 
 # --- Main function to process all divisions ---
-def generate_league_table_graphics(file_path: str, logos_folder: str, save_folder: str):
+def read_league_tables(file_path: str) -> tuple:
     """
-    Main function to process all divisions and generate league table graphics.
+    Reads the table date and every division's table from the workbook.
     Includes robust file discovery and debugging.
+    Returns (current_date, [(division, league_data), ...]).
     """
-    global LEAGUE_TABLE_FILE_PATH # Allow updating the global constant reference
-
     # ----------------------------------------------------
     # 🛑 CRITICAL DEBUGGING & FILE RESOLUTION SECTION 🛑
     # ----------------------------------------------------
-    base_dir_used = os.path.dirname(os.path.abspath(__file__))
+    base_dir_used = os.path.dirname(os.path.abspath(file_path))
     
     print("\n--- DEBUGGING FILE PATH START ---")
-    print(f"DEBUG: BASE_DIR (Script Directory) is: {base_dir_used}")
+    print(f"DEBUG: Workbook directory is: {base_dir_used}")
     
     # List all files and identify .xlsx files
     found_xlsx_files = []
@@ -459,7 +361,9 @@ def generate_league_table_graphics(file_path: str, logos_folder: str, save_folde
         
     # Determine the correct file name to use
     final_file_name = None
-    if 'table.xlsx' in found_xlsx_files:
+    if os.path.basename(file_path) in found_xlsx_files:
+        final_file_name = os.path.basename(file_path)
+    elif 'table.xlsx' in found_xlsx_files:
         final_file_name = 'table.xlsx' 
     elif 'results.xlsx' in found_xlsx_files:
         final_file_name = 'results.xlsx' 
@@ -468,7 +372,6 @@ def generate_league_table_graphics(file_path: str, logos_folder: str, save_folde
         
     if final_file_name:
         file_path = os.path.join(base_dir_used, final_file_name)
-        LEAGUE_TABLE_FILE_PATH = file_path # Update global constant
         print(f"DEBUG: Final resolved XLSX path set to: {file_path}")
     else:
         file_path = os.path.join(base_dir_used, "table.xlsx") # Fallback to original path
@@ -477,9 +380,6 @@ def generate_league_table_graphics(file_path: str, logos_folder: str, save_folde
     print("--- DEBUGGING FILE PATH END ---\n")
     # ----------------------------------------------------
     
-    # Initialize the logo lookup map before processing any data
-    build_logo_lookup(LOGOS_FOLDER)
-
     current_date = datetime.now()
     try:
         # Check file existence again using the resolved path
@@ -520,6 +420,7 @@ def generate_league_table_graphics(file_path: str, logos_folder: str, save_folde
         print(f"CRITICAL ERROR (Pandas/Data): Error reading 'Division 1' sheet or date parsing failed: {e}. Using current date.")
 
     divisions_to_generate = ["Division 1", "Division 2", "Division 3", "Division 4"]
+    tables_to_draw = []
     for division in divisions_to_generate:
         print(f"Processing {division}...")
         # Pass the dynamically resolved path
@@ -527,19 +428,50 @@ def generate_league_table_graphics(file_path: str, logos_folder: str, save_folde
         if not league_data.empty:
             required_cols = ['Pos', 'Team', 'P', 'W', 'D', 'L', 'GD', 'PTS']
             if all(col in league_data.columns for col in required_cols):
-                create_league_table_graphic(
-                    league_data,
-                    logos_folder,
-                    save_folder,
-                    division,
-                    current_date
-                )
+                tables_to_draw.append((division, league_data))
             else:
                 print(f"Skipping {division}: Data is missing one or more required columns ({required_cols}).")
         else:
             print(f"No data found for {division}.")
+    return current_date, tables_to_draw
+
+
+def generate_league_table_graphics(file_path: str, logos_folder: str, save_folder: str, templates_folder: str = TEMPLATES_FOLDER, font_path: str = FONT_PATH, progress_callback=None, workbook=None):
+    """
+    Main function to process all divisions and generate league table graphics.
+    progress_callback, if given, is called as (part_number, total_parts, path) after each save.
+    Returns the list of saved graphic paths.
+    """
+    # Scan the logos once before processing any data
+    get_logo_index(logos_folder)
+
+    if workbook is not None:
+        print("Using pre-parsed workbook data.")
+        current_date = workbook.date if workbook.date is not None else datetime.now()
+        tables_to_draw = list(workbook.divisions.items())
+    else:
+        current_date, tables_to_draw = read_league_tables(file_path)
+
+    # Draw only once every division is parsed, so progress can report "N of M"
+    saved_paths = []
+    for part_number, (division, league_data) in enumerate(tables_to_draw, start=1):
+        checkpoint()
+        path = create_league_table_graphic(
+            league_data,
+            logos_folder,
+            save_folder,
+            division,
+            current_date,
+            templates_folder,
+            font_path
+        )
+        if path:
+            saved_paths.append(path)
+            if progress_callback:
+                progress_callback(part_number, len(tables_to_draw), path)
 
     print("Table graphics generation finished.")
+    return saved_paths
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+import os
+import sys
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from logo_index import LogoIndex  # noqa: E402
+
+LOGOS_FOLDER = os.path.join(REPO_ROOT, "Logos")
+
+
+@pytest.fixture(scope="module")
+def index():
+    return LogoIndex(LOGOS_FOLDER)
+
+
+@pytest.mark.parametrize("team_name, logo", [
+    ("Basingstok Lions", "Basingstoke Lions.png"),
+    ("Tadley", "Tadley Town.png"),
+    ("Hook", "Hook FC.jpg"),
+    ("The Winkle", "The Winkle FC.png"),
+    ("Chineham Tiger", "Chineham Tigers.jpg"),
+    ("Sherborne St. John", "Sherborne St John.png"),
+])
+def test_misspelt_or_shortened_names_find_their_logo(index, team_name, logo):
+    match = index.match(team_name, warn=False)
+    assert match.method == "fuzzy"
+    assert os.path.basename(match.path) == logo
+
+
+@pytest.mark.parametrize("team_name", [
+    "Oakridge A",
+    "Oakridge C",
+    "Hampshire Lions",
+    "Basing Rovers",
+    "Basingstoke Rovers",
+    "Basingstoke Town",
+    "Chineham Town",
+])
+def test_teams_without_a_logo_never_take_another_clubs_crest(index, team_name):
+    match = index.match(team_name, warn=False)
+    assert match.method == "none"
+    assert match.path is None
+
+
+@pytest.mark.parametrize("team_name", ["Hampshire", "AFC Basingstoke"])
+def test_names_with_several_close_logos_are_ambiguous(index, team_name):
+    match = index.match(team_name, warn=False)
+    assert match.method == "ambiguous"
+    assert match.path is None
+    assert len(match.alternatives) > 1
+
+
+def test_exact_and_alias_matches(index):
+    assert index.match("Basing United", warn=False).method == "exact"
+    alias = index.match("AFC Aldermaston A", warn=False)
+    assert alias.method == "alias"
+    assert os.path.basename(alias.path) == "AFC Aldermaston.png"
@@ -0,0 +1,314 @@
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import NamedTuple, Optional
+import pandas as pd
+
+# --- Configuration Constants ---
+LEAGUE_DIVISIONS = ["Division 1", "Division 2", "Division 3", "Division 4"]
+CUP_SHEET = "Cup"
+DATE_SHEET = "Date"
+MATCH_COLUMNS = ["Team 1 name", "Team 1 score", "Team 2 score", "Team 2 name"]
+TABLE_COLUMNS = ["Pos", "Team", "P", "W", "D", "L", "GD", "PTS"]
+TABLE_DATE_FORMATS = ['%d/%m/%Y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d-%m-%Y']
+MATCH_OF_THE_DAY_ROWS = 9
+MATCH_OF_THE_DAY_REQUIRED_KEYS = ["home_team", "away_team"]
+MAX_CACHED_WORKBOOKS = 32
+
+RESULTS_WORKBOOK = "results.xlsx"
+TABLE_WORKBOOK = "table.xlsx"
+MATCH_OF_THE_DAY_WORKBOOK = "match of the day.xlsx"
+
+
+class WorkbookError(ValueError):
+    """
+    Raised when an uploaded workbook does not have the sheets or columns the generators need.
+    """
+
+
+# --- Models ---
+class Match(NamedTuple):
+    """
+    One row of a results/fixtures sheet. Unpacks like the tuples the generators
+    have always used: the first five fields for fixtures, all six for results.
+    """
+    team_1_name: str
+    team_1_score: str
+    team_2_score: str
+    team_2_name: str
+    cup_name: Optional[str] = None
+    penalty_score: Optional[str] = None
+
+
+@dataclass
+class ResultsWorkbook:
+    date: Optional[datetime]
+    divisions: dict[str, list[Match]]
+    warnings: list[str] = field(default_factory=list)
+    sheets: dict[str, pd.DataFrame] = field(default_factory=dict)
+
+    def matches(self, division: str) -> list[Match]:
+        return list(self.divisions.get(division, []))
+
+
+@dataclass
+class TableWorkbook:
+    date: Optional[datetime]
+    divisions: dict[str, pd.DataFrame]
+    warnings: list[str] = field(default_factory=list)
+
+
+@dataclass
+class MatchOfTheDayWorkbook:
+    match_data: dict
+    warnings: list[str] = field(default_factory=list)
+
+
+# --- Parsers ---
+def _read_sheets(data: bytes) -> dict[str, pd.DataFrame]:
+    try:
+        return pd.read_excel(io.BytesIO(data), sheet_name=None)
+    except Exception as e:
+        raise WorkbookError(f"Could not read workbook: {e}") from e
+
+
+def _cell_text(value) -> str:
+    # A score column with blanks is read as floats; whole numbers show as "3", not "3.0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _score_text(value) -> str:
+    return _cell_text(value) if pd.notna(value) else "-"
+
+
+def _matches_from_frame(df: pd.DataFrame, division: str, warnings: list[str]) -> list[Match]:
+    is_cup = division.lower() == CUP_SHEET.lower()
+    matches = []
+    for _, row in df.iterrows():
+        team_1_name = str(row['Team 1 name']).strip() if pd.notna(row['Team 1 name']) else ""
+        team_1_score = _score_text(row['Team 1 score'])
+        team_2_score = _score_text(row['Team 2 score'])
+        team_2_name = str(row['Team 2 name']).strip() if pd.notna(row['Team 2 name']) else ""
+        cup_name = str(row['Cup name']).strip() if is_cup and 'Cup name' in row and pd.notna(row['Cup name']) else None
+        penalty_score = None
+        if is_cup and 'Penalty score' in row and pd.notna(row['Penalty score']):
+            penalty_score = str(row['Penalty score']).strip()
+            if not ("-" in penalty_score and len(penalty_score.split("-")) == 2):
+                warnings.append(f"Invalid penalty score '{penalty_score}' for {team_1_name} vs {team_2_name}")
+                penalty_score = None
+        if team_1_name and team_2_name:
+            matches.append(Match(team_1_name, team_1_score, team_2_score, team_2_name, cup_name, penalty_score))
+    return matches
+
+
+def parse_results_workbook(data: bytes) -> ResultsWorkbook:
+    """
+    Parses results.xlsx (used by both the fixtures and results graphics) in a single read.
+    Raises WorkbookError if a division sheet is missing its team/score columns.
+    """
+    return results_workbook_from_frames(_read_sheets(data))
+
+
+def results_workbook_from_frames(sheets: dict[str, pd.DataFrame]) -> ResultsWorkbook:
+    """
+    Builds the results model from sheet frames that are already in memory,
+    e.g. straight from the in-browser editor, with the same validation as an upload.
+    """
+    errors, warnings = [], []
+    divisions = {}
+    for division in LEAGUE_DIVISIONS + [CUP_SHEET]:
+        if division not in sheets:
+            warnings.append(f"Sheet '{division}' not found; it will be left out.")
+            continue
+        df = sheets[division]
+        missing = [col for col in MATCH_COLUMNS if col not in df.columns]
+        if missing:
+            errors.append(f"Sheet '{division}' is missing column(s): {', '.join(missing)}")
+            continue
+        divisions[division] = _matches_from_frame(df, division, warnings)
+    if errors:
+        raise WorkbookError("; ".join(errors))
+
+    date = None
+    date_df = sheets.get(DATE_SHEET)
+    if date_df is not None and not date_df.empty and 'Date' in date_df.columns:
+        date = pd.to_datetime(str(date_df['Date'].iloc[0]).strip(), errors='coerce')
+        if pd.isna(date):
+            date = None
+    if date is None:
+        warnings.append(f"No valid date in the '{DATE_SHEET}' sheet; today's date will be used.")
+    return ResultsWorkbook(date, divisions, warnings, sheets)
+
+
+def _parse_table_date(value) -> Optional[datetime]:
+    date_str = str(value).strip()
+    for fmt in TABLE_DATE_FORMATS:
+        try:
+            return pd.to_datetime(date_str, format=fmt, errors='raise')
+        except ValueError:
+            continue
+    parsed_date = pd.to_datetime(date_str, errors='coerce')
+    return None if pd.isna(parsed_date) else parsed_date
+
+
+def parse_table_workbook(data: bytes) -> TableWorkbook:
+    """
+    Parses table.xlsx in a single read. The date lives in 'Division 1', cell R2C9.
+    Raises WorkbookError if a division sheet is missing any table column.
+    """
+    sheets = _read_sheets(data)
+    errors, warnings = [], []
+    divisions = {}
+    for division in LEAGUE_DIVISIONS:
+        df = sheets.get(division)
+        if df is None or df.empty:
+            warnings.append(f"No data found for {division}; it will be left out.")
+            continue
+        missing = [col for col in TABLE_COLUMNS if col not in df.columns]
+        if missing:
+            errors.append(f"Sheet '{division}' is missing column(s): {', '.join(missing)}")
+            continue
+        divisions[division] = df
+    if errors:
+        raise WorkbookError("; ".join(errors))
+
+    # Read with a header row, so sheet cell R2C9 is data row 0, column 8
+    date = None
+    first_division = sheets.get(LEAGUE_DIVISIONS[0])
+    if first_division is not None and first_division.shape[0] > 0 and first_division.shape[1] > 8:
+        date = _parse_table_date(first_division.iloc[0, 8])
+    if date is None:
+        warnings.append(f"No valid date in '{LEAGUE_DIVISIONS[0]}' cell R2C9; today's date will be used.")
+    return TableWorkbook(date, divisions, warnings)
+
+
+def parse_match_of_the_day_workbook(data: bytes) -> MatchOfTheDayWorkbook:
+    """
+    Parses the two-column match of the day workbook (labels in column A, values in column B).
+    Raises WorkbookError if the home or away team is missing.
+    """
+    try:
+        df = pd.read_excel(io.BytesIO(data), header=None, usecols="A:B")
+    except Exception as e:
+        raise WorkbookError(f"Could not read workbook: {e}") from e
+    if df.shape[1] < 2:
+        raise WorkbookError("Expected labels in column A and values in column B.")
+
+    match_data = {}
+    labels = df.iloc[0:MATCH_OF_THE_DAY_ROWS, 0].tolist()
+    values = df.iloc[0:MATCH_OF_THE_DAY_ROWS, 1].tolist()
+    for label, value in zip(labels, values):
+        key = str(label).strip().lower().replace(" ", "_")
+        if pd.isna(value):
+            match_data[key] = [] if key in ["home_scorers", "away_scorers"] else ""
+        elif key in ["home_scorers", "away_scorers"]:
+            match_data[key] = [s.strip() for s in str(value).split(',') if s.strip()]
+        else:
+            match_data[key] = str(value).strip()
+
+    missing = [key for key in MATCH_OF_THE_DAY_REQUIRED_KEYS if not match_data.get(key)]
+    if missing:
+        raise WorkbookError(f"Missing value(s) for: {', '.join(missing)}")
+    return MatchOfTheDayWorkbook(match_data)
+
+
+def editable_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns a copy of a match sheet with every column as text, so scores can be
+    typed freely in the editor and whole numbers do not turn into '3.0'.
+    """
+    frame = df.copy()
+    for col in frame.columns:
+        values = frame[col]
+        if pd.api.types.is_float_dtype(values):
+            # Same text the parser gives, so an edited and an uploaded sheet make identical models
+            values = values.map(_cell_text, na_action="ignore")
+        frame[col] = values.astype("string")
+    return frame
+
+
+def export_workbook(sheets: dict[str, pd.DataFrame]) -> bytes:
+    """
+    Writes sheet frames back out as an .xlsx file in memory.
+    """
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return buffer.getvalue()
+
+
+WORKBOOK_PARSERS = {
+    MATCH_OF_THE_DAY_WORKBOOK: parse_match_of_the_day_workbook,
+    RESULTS_WORKBOOK: parse_results_workbook,
+    TABLE_WORKBOOK: parse_table_workbook,
+}
+
+
+# --- Content-Hash Cache ---
+_WORKBOOK_CACHE = OrderedDict()
+_WORKBOOK_CACHE_LOCK = threading.Lock()
+
+
+def workbook_digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def get_workbook(name: str, data: bytes):
+    """
+    Returns the parsed model for a workbook's bytes. Each distinct content is
+    parsed once; later calls with the same bytes are served from memory.
+    Models are shared between sessions and threads, so treat them as read-only.
+    Raises WorkbookError for unknown workbook names or invalid contents.
+    """
+    if name not in WORKBOOK_PARSERS:
+        raise WorkbookError(f"{name} is not a recognized workbook.")
+    key = (name, workbook_digest(data))
+    with _WORKBOOK_CACHE_LOCK:
+        if key in _WORKBOOK_CACHE:
+            _WORKBOOK_CACHE.move_to_end(key)
+            return _WORKBOOK_CACHE[key]
+
+    model = WORKBOOK_PARSERS[name](data)
+
+    with _WORKBOOK_CACHE_LOCK:
+        _WORKBOOK_CACHE[key] = model
+        while len(_WORKBOOK_CACHE) > MAX_CACHED_WORKBOOKS:
+            _WORKBOOK_CACHE.popitem(last=False)
+    return model
+
+
+def model_digest(workbook) -> str:
+    """
+    Returns a hash of a parsed model's content, so identical data gives the same
+    digest whether it came from an upload, a default workbook or the editor.
+    A missing date stands for today, as it does when rendering.
+    """
+    digest = hashlib.sha1(type(workbook).__name__.encode("utf-8"))
+    if isinstance(workbook, MatchOfTheDayWorkbook):
+        digest.update(repr(sorted(workbook.match_data.items())).encode("utf-8"))
+        return digest.hexdigest()
+    date = workbook.date if workbook.date is not None else datetime.now().date()
+    digest.update(str(date).encode("utf-8"))
+    for division, content in workbook.divisions.items():
+        digest.update(division.encode("utf-8"))
+        if isinstance(content, pd.DataFrame):
+            digest.update(content.to_csv(index=False).encode("utf-8"))
+        else:
+            digest.update(repr(content).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_workbook_file(path: str, name: str = None):
+    """
+    Reads a workbook from disk and returns its cached model (see get_workbook).
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    return get_workbook(name or os.path.basename(path), data)
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+from dataclasses import dataclass
+
+# --- Configuration Constants ---
+SYNC_STATE_FILENAME = ".sync_state.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+PERMISSIVE_EXTENSIONS = (".ttf", ".otf", ".xlsx")
+SESSION_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+# --- Helper Functions ---
+def file_digest(path: str) -> str:
+    """
+    Returns the SHA-1 hex digest of a file, read in chunks.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_sync_state(workspace_dir: str) -> dict:
+    state_path = os.path.join(workspace_dir, SYNC_STATE_FILENAME)
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_sync_state(workspace_dir: str, state: dict):
+    state_path = os.path.join(workspace_dir, SYNC_STATE_FILENAME)
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def _iter_source_files(repo_root: str, files: list[str], dirs: list[str]):
+    """
+    Yields (relative_path, absolute_path) for every file to be synced.
+    Missing entries are yielded with an absolute path of None.
+    """
+    for item in files:
+        source_path = os.path.join(repo_root, item)
+        yield item, (source_path if os.path.isfile(source_path) else None)
+    for item in dirs:
+        source_dir = os.path.join(repo_root, item)
+        if not os.path.isdir(source_dir):
+            yield item, None
+            continue
+        for current_dir, _, filenames in os.walk(source_dir):
+            for filename in filenames:
+                abs_path = os.path.join(current_dir, filename)
+                yield os.path.relpath(abs_path, repo_root), abs_path
+
+
+def asset_version(workspace_dir: str) -> str:
+    """
+    Returns a hash identifying the exact set of files last synced into workspace_dir
+    (fonts, logos, templates and default workbooks), taken from the sync state.
+    """
+    state = _load_sync_state(workspace_dir)
+    entries = sorted((rel_path, entry["sha1"]) for rel_path, entry in state.items())
+    return hashlib.sha1(json.dumps(entries).encode("utf-8")).hexdigest()
+
+
+# --- Main Sync Function ---
+def sync_workspace(repo_root: str, workspace_dir: str, files: list[str], dirs: list[str]) -> dict:
+    """
+    Brings workspace_dir in line with the listed repository files and folders,
+    copying only files whose size, mtime or content hash changed since the last sync.
+
+    A file in the workspace is only overwritten when its *source* changes, so
+    workbooks uploaded into the workspace survive Streamlit reruns.
+    Returns a report dict with 'copied', 'unchanged', 'removed' and 'missing' lists.
+    """
+    os.makedirs(workspace_dir, exist_ok=True)
+    previous_state = _load_sync_state(workspace_dir)
+    state = {}
+    report = {"copied": [], "unchanged": [], "removed": [], "missing": []}
+
+    for rel_path, source_path in _iter_source_files(repo_root, files, dirs):
+        if source_path is None:
+            report["missing"].append(rel_path)
+            continue
+
+        dest_path = os.path.join(workspace_dir, rel_path)
+        stat = os.stat(source_path)
+        entry = previous_state.get(rel_path)
+        dest_exists = os.path.exists(dest_path)
+
+        if entry and dest_exists and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            state[rel_path] = entry
+            report["unchanged"].append(rel_path)
+            continue
+
+        digest = file_digest(source_path)
+        state[rel_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": digest}
+        if entry and dest_exists and entry["sha1"] == digest:
+            # Touched but identical content: just record the new mtime
+            report["unchanged"].append(rel_path)
+            continue
+
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copy2(source_path, dest_path)
+        if rel_path.endswith(PERMISSIVE_EXTENSIONS):
+            try:
+                os.chmod(dest_path, 0o777)
+            except OSError as e:
+                print(f"Warning: Could not set permissions for {rel_path}. {e}")
+        report["copied"].append(rel_path)
+
+    # Drop files that disappeared from the repository since the last sync
+    for rel_path in previous_state:
+        if rel_path not in state and rel_path not in report["missing"]:
+            stale_path = os.path.join(workspace_dir, rel_path)
+            if os.path.isfile(stale_path):
+                os.remove(stale_path)
+            report["removed"].append(rel_path)
+
+    _save_sync_state(workspace_dir, state)
+    return report
+
+
+# --- Per-Session Workspaces ---
+@dataclass(frozen=True)
+class SessionWorkspace:
+    """
+    One browser session's view of the project files.
+
+    Logos, templates, fonts and the default workbooks are read straight from the
+    shared, read-only assets_dir. Uploaded workbooks and generated graphics live
+    in the session's own root, so concurrent sessions never touch each other's files.
+    """
+    root: str
+    assets_dir: str
+
+    @property
+    def logos_dir(self) -> str:
+        return os.path.join(self.assets_dir, "Logos")
+
+    @property
+    def templates_dir(self) -> str:
+        return os.path.join(self.assets_dir, "Templates")
+
+    @property
+    def graphics_dir(self) -> str:
+        return os.path.join(self.root, "Graphics")
+
+    def asset(self, name: str) -> str:
+        return os.path.join(self.assets_dir, name)
+
+    def workbook(self, name: str) -> str:
+        """
+        Copy-on-write lookup: the session's uploaded workbook if there is one,
+        otherwise the shared default from the repository.
+        """
+        session_path = os.path.join(self.root, name)
+        if os.path.exists(session_path):
+            return session_path
+        return os.path.join(self.assets_dir, name)
+
+    def save_upload(self, name: str, data: bytes) -> str:
+        """
+        Writes an uploaded workbook into the session root and returns its path.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, os.path.basename(name))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+
+def open_session_workspace(sessions_root: str, session_id: str, assets_dir: str) -> SessionWorkspace:
+    """
+    Creates (or reuses) the workspace for session_id under sessions_root.
+    """
+    workspace = SessionWorkspace(os.path.join(sessions_root, session_id), assets_dir)
+    os.makedirs(workspace.graphics_dir, exist_ok=True)
+    # Mark the session as alive so pruning leaves it alone
+    os.utime(workspace.root)
+    return workspace
+
+
+def prune_session_workspaces(sessions_root: str, max_age_seconds: float = SESSION_MAX_AGE_SECONDS) -> list[str]:
+    """
+    Deletes session workspaces that have not been opened for max_age_seconds.
+    Returns the list of removed session directories.
+    """
+    removed = []
+    if not os.path.isdir(sessions_root):
+        return removed
+    cutoff = time.time() - max_age_seconds
+    for entry in os.scandir(sessions_root):
+        if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed.append(entry.path)
+    return removed